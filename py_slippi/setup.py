@@ -12,7 +12,8 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     description="Parsing library for SSBM replay files",
-    install_requires=['py-ubjson', 'termcolor'],
+    extras_require={'columnar': ['numpy']},
+    install_requires=['termcolor'],
     long_description=long_description,
     long_description_content_type="text/x-rst",
     name="py_slippi",
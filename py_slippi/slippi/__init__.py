@@ -1,2 +1,6 @@
+from .batch import parse_many
+from .cache import ReplayCache
 from .game import Game
-from .parse import parse
+from .index import build_index, index_path, open_index, read_frames
+from .parse import follow, iter_events, iter_frames, parse, read_metadata, read_metadata_dir
+from .summary import summarize
@@ -0,0 +1,157 @@
+"""Parse many replays at once, in a pool of worker processes."""
+
+import collections, functools, itertools, os
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+
+from .cache import ReplayCache, _read_columnar, _read_header
+from .game import Game
+from .parse import ParseError, ParseStats, read_metadata
+from .summary import summarize
+from .util import *
+
+
+def _read_stats(path):
+    stats = ParseStats()
+    Game(path, stats=stats)
+    return stats
+
+
+def _share(game):
+    return game._share()
+
+
+def _attach(shared):
+    return shared.attach()
+
+
+# Built-in modes: what a worker does with each replay. Results should be small, as they're pickled back to the parent process.
+MODES = {
+    'metadata': read_metadata, # :py:class:`slippi.metadata.Metadata`, or None for an in-progress replay
+    'header': _read_header, # :py:class:`slippi.game.Game` without frames (start, end & metadata only)
+    'game': Game, # full :py:class:`slippi.game.Game`. Large, and slow to send back; prefer a custom mode that extracts what you need.
+    'columnar': _read_columnar, # :py:class:`slippi.columnar.ColumnarGame`, sent back through shared memory (requires `numpy`, and Python 3.8 with more than one worker)
+    'stats': _read_stats, # :py:class:`slippi.parse.ParseStats` for a full parse (add them up for totals)
+    'summary': summarize} # :py:class:`slippi.summary.Summary`: the game's outcome, without building any frames
+
+# Modes whose results are sent back from workers as handles, which the parent process turns back into results.
+_SEND = {'columnar': _share}
+_RECEIVE = {'columnar': _attach}
+
+
+def _cpu_count():
+    # CPUs this process may actually use, which can be fewer than the machine has (e.g. in a container)
+    try: return len(os.sched_getaffinity(0))
+    except AttributeError: return os.cpu_count() or 1
+
+
+def _mode(fn, kind, cache, send, path):
+    """What a worker does with each replay: get the mode's result, through the cache if there is one, and prepare it to be sent back."""
+
+    result = fn(path) if cache is None else cache.get(path, kind, fn)
+    return result if send is None else send(result)
+
+
+def _receive(fn, results):
+    """Apply `fn` to each result that isn't an error."""
+
+    received = []
+    for (path, result) in results:
+        if not isinstance(result, Exception):
+            try: result = fn(result)
+            except Exception as e: result = e
+        received.append((path, result))
+    return received
+
+
+def _run(fn, paths):
+    """Apply `fn` to each path, returning errors in place of results."""
+
+    results = []
+    for path in paths:
+        try: results.append((path, fn(path)))
+        except Exception as e: results.append((path, e))
+    return results
+
+
+def parse_many(paths: Iterable[Union[str, os.PathLike]], mode: Union[str, Callable[[str], Any]] = 'metadata', workers: Optional[int] = None, chunksize: int = 8, ordered: bool = True, cache: Optional[ReplayCache] = None) -> Iterator[Tuple[str, Any]]:
+    """Parse many replays in parallel, as a generator of `(path, result)` pairs.
+
+    Paths are sent to worker processes in chunks, and only a bounded number of chunks is in flight at once, so `paths` can be a lazy iterable of any length. A replay that fails to parse doesn't stop the batch: its exception (usually a :py:class:`slippi.parse.ParseError`) is yielded in place of its result.
+
+    When using this from a script, guard the script's entry point with `if __name__ == '__main__':`, as worker processes may import it.
+
+    :param paths: replay paths
+    :param mode: what to get from each replay: one of the names in :py:data:`MODES`, or a function taking a path. A function must be picklable (i.e. defined at the top level of a module), as must its results. Returning a compact summary rather than a whole :py:class:`slippi.game.Game` keeps the cost of sending results back to a minimum.
+    :param workers: number of worker processes (default: one per available CPU). With 1, replays are parsed in this process.
+    :param chunksize: number of replays sent to a worker at a time
+    :param ordered: when true, results are yielded in the same order as `paths`; otherwise, as soon as they're ready
+    :param cache: if not None, get results from this cache where possible, and store new ones in it. Results of a function `mode` are cached under the function's qualified name, so they're only refreshed when the replay changes; use a different name for a function that returns something different."""
+
+    if isinstance(mode, str):
+        (fn, kind, send, receive) = (MODES[mode], mode, _SEND.get(mode), _RECEIVE.get(mode))
+    else:
+        (fn, kind, send, receive) = (mode, '%s.%s' % (mode.__module__, mode.__qualname__), None, None)
+    paths = (os.fspath(p) for p in paths)
+    workers = workers or _cpu_count()
+
+    if workers == 1:
+        if cache is not None:
+            fn = functools.partial(_mode, fn, kind, cache, None)
+        for path in paths:
+            yield from _run(fn, (path,))
+        return
+
+    if cache is not None or send is not None:
+        fn = functools.partial(_mode, fn, kind, cache, send)
+
+    if receive is not None and os.name == 'posix':
+        # Workers share this process's resource tracker (which frees shared memory left behind by a crash) if it's
+        # already running. Otherwise each starts its own, which would free the worker's results when it exits.
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+
+    import concurrent.futures # slow to import, so only when there's a pool to run
+
+    pending: collections.OrderedDict = collections.OrderedDict() # future -> chunk
+    try:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+
+            def submit():
+                chunk = list(itertools.islice(paths, chunksize))
+                if chunk:
+                    pending[pool.submit(_run, fn, chunk)] = chunk
+                return bool(chunk)
+
+            try:
+                # keep every worker busy, with one chunk queued behind each
+                for _ in range(2 * workers):
+                    if not submit():
+                        break
+
+                while pending:
+                    if ordered:
+                        future = next(iter(pending))
+                        concurrent.futures.wait((future,))
+                    else:
+                        (done, _) = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        future = next(iter(done))
+                    chunk = pending.pop(future)
+                    submit()
+
+                    try: results = future.result()
+                    except Exception as e: # e.g. an unpicklable result, or a crashed worker
+                        results = [(path, e) for path in chunk]
+                    else:
+                        if receive is not None: # all at once, so nothing is left behind if iteration stops partway
+                            results = _receive(receive, results)
+                    yield from results
+            finally:
+                for future in pending:
+                    future.cancel()
+    finally:
+        # The pool has shut down, so leftover futures are either cancelled or done. Results that were never
+        # received may be holding resources (e.g. shared memory), which receiving then dropping them frees.
+        if receive is not None:
+            for future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    _receive(receive, future.result())
@@ -0,0 +1,175 @@
+"""An on-disk cache of parse results, so that replays seen before don't have to be parsed again."""
+
+from __future__ import annotations
+
+# `hashlib`, `pickle` & `tempfile` are imported where they're used, to keep `import slippi` fast.
+import os
+from typing import Any, Callable, Iterable, Optional, Union
+
+from .game import Game
+from .metadata import Metadata
+from .parse import read_metadata
+from .summary import Summary, summarize
+from .util import *
+
+
+def _default_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'slippi')
+
+
+def _read_header(path):
+    return Game(path, skip_frames=True)
+
+
+def _read_columnar(path):
+    from .columnar import ColumnarGame
+    return ColumnarGame(path)
+
+
+class ReplayCache(Base):
+    """A directory of parse results, one file per replay and kind of result. Results are keyed by either the replay's contents or its path, size & modification time, and are evicted least-recently-used first once the directory grows past `max_size`.
+
+    Entries are pickles, so only use a cache directory you trust. Several processes can safely share one (e.g. the workers of :py:func:`slippi.batch.parse_many`)."""
+
+    __slots__ = 'path', 'max_size', 'key', '_size'
+
+    # Entry file format: magic, then the pickled result. Bump the version when parse results change shape, so older entries are ignored.
+    _MAGIC = b'SLPCACHE\x03'
+    _SUFFIX = '.slpc'
+
+    def __init__(self, path: Union[str, os.PathLike, None] = None, max_size: int = 256 * 1024 * 1024, key: str = 'content'):
+        """:param path: cache directory, created as needed (default: `slippi` in the user's cache directory, e.g. `~/.cache/slippi`)
+        :param max_size: total size of entries, in bytes, beyond which the least recently used ones are deleted
+        :param key: how replays are identified: `'content'` (a hash of the whole file; survives copying & renaming) or `'stat'` (path, size & modification time; doesn't require reading the file)"""
+
+        if key not in ('content', 'stat'):
+            raise ValueError('invalid key: %s' % key)
+        self.path = os.fspath(path) if path is not None else _default_path() #: Cache directory
+        self.max_size = max_size #: Size limit for all entries, in bytes
+        self.key = key #: How replays are identified (`'content'` or `'stat'`)
+        self._size: Optional[int] = None # estimated total size of entries, once known
+
+    def get(self, replay: Union[str, os.PathLike], kind: str, fn: Callable[[str], Any]) -> Any:
+        """Get a result for `replay` from the cache, or compute it with `fn(replay)` and store it. Exceptions from `fn` propagate, and aren't cached.
+
+        :param replay: replay path
+        :param kind: name for this kind of result, e.g. `'metadata'`. Change it whenever `fn` changes what it returns.
+        :param fn: function that computes the result from the replay's path. Results must be picklable."""
+
+        import pickle
+
+        replay = os.fspath(replay)
+        entry = self._entry(replay, kind)
+        try:
+            with open(entry, 'rb') as f:
+                data = f.read()
+        except OSError:
+            pass
+        else:
+            if data.startswith(self._MAGIC):
+                try: result = pickle.loads(data[len(self._MAGIC):])
+                except Exception: pass # damaged, or written by an incompatible version
+                else:
+                    # recently used entries are the last to be evicted
+                    try: os.utime(entry)
+                    except OSError: pass
+                    return result
+
+        result = fn(replay)
+        self._store(entry, self._MAGIC + pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        return result
+
+    def metadata(self, replay: Union[str, os.PathLike], skip: Iterable[str] = ()) -> Optional[Metadata]:
+        """Cached :py:func:`slippi.parse.read_metadata`. Results for different sets of `skip` keys are cached separately.
+
+        Reading metadata only takes a seek & a small read, so with `'content'` keys (which read the whole replay to hash it) a cache hit is slower than no cache. Use `'stat'` keys for metadata."""
+        skip = sorted(skip)
+        kind = 'metadata-skip:' + ','.join(skip) if skip else 'metadata'
+        return self.get(replay, kind, lambda path: read_metadata(path, skip))
+
+    def header(self, replay: Union[str, os.PathLike]) -> Game:
+        """Cached :py:class:`slippi.game.Game` without frames (start, end & metadata only; see `skip_frames`)."""
+        return self.get(replay, 'header', _read_header)
+
+    def summary(self, replay: Union[str, os.PathLike]) -> Summary:
+        """Cached :py:func:`slippi.summary.summarize`."""
+        return self.get(replay, 'summary', summarize)
+
+    def columnar(self, replay: Union[str, os.PathLike]):
+        """Cached :py:class:`slippi.columnar.ColumnarGame` (requires `numpy`). These take up about as much space as the replay itself."""
+        return self.get(replay, 'columnar', _read_columnar)
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        for (entry, _, _) in self._entries():
+            try: os.remove(entry)
+            except OSError: pass
+        self._size = 0
+
+    def _entry(self, replay, kind):
+        """Path of the entry for `replay`'s result of the given kind."""
+
+        import hashlib
+
+        h = hashlib.sha1()
+        if self.key == 'content':
+            with open(replay, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    h.update(block)
+        else:
+            st = os.stat(replay)
+            h.update(('%s\0%d\0%d' % (os.path.abspath(replay), st.st_size, st.st_mtime_ns)).encode('utf-8', 'surrogateescape'))
+        h.update(b'\0' + kind.encode('utf-8'))
+        return os.path.join(self.path, h.hexdigest() + self._SUFFIX)
+
+    def _entries(self):
+        """`(path, size, last used)` of every entry."""
+        entries = []
+        try: it = os.scandir(self.path)
+        except FileNotFoundError: return entries
+        with it:
+            for e in it:
+                if e.name.endswith(self._SUFFIX):
+                    try: st = e.stat()
+                    except OSError: continue # evicted by another process
+                    entries.append((e.path, st.st_size, st.st_mtime_ns))
+        return entries
+
+    def _store(self, entry, data):
+        if len(data) > self.max_size:
+            return
+
+        import tempfile
+
+        os.makedirs(self.path, exist_ok=True)
+        (fd, tmp) = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=self.path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, entry)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        if self._size is None:
+            self._size = sum(size for (_, size, _) in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries, leaving some room so that the next few stores don't have to evict again."""
+
+        entries = self._entries()
+        entries.sort(key=lambda e: e[2])
+        size = sum(size for (_, size, _) in entries)
+        target = self.max_size * 3 // 4
+        for (entry, entry_size, _) in entries:
+            if size <= target:
+                break
+            try: os.remove(entry)
+            except OSError: pass
+            size -= entry_size
+        self._size = size
@@ -0,0 +1,298 @@
+"""Columnar access to frame data, decoded straight into NumPy arrays. Requires `numpy`."""
+
+from __future__ import annotations
+
+# `multiprocessing.shared_memory` is imported where it's used, as it needs Python 3.8 (only games shared between processes do).
+import functools, os
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .event import End, EventType, Frame, Start
+from .metadata import Metadata
+from .parse import ParseEvent, _open, _parse_header, _parse_metadata
+from .util import *
+
+if TYPE_CHECKING:
+    from multiprocessing import shared_memory
+
+
+# NumPy equivalents of the `struct` codes used in event layouts. Replays are big-endian, and so are the arrays.
+_DTYPES = {
+    'b': 'i1', 'B': 'u1', '?': '?',
+    'h': '>i2', 'H': '>u2',
+    'i': '>i4', 'I': '>u4', 'l': '>i4', 'L': '>u4',
+    'q': '>i8', 'Q': '>u8',
+    'f': '>f4', 'd': '>f8'}
+
+
+def _dtype(layout: Layout, size: int) -> np.dtype:
+    """Structured dtype matching a payload of `size` bytes. Fields the layout doesn't know about are skipped over."""
+
+    names = []
+    formats = []
+    offsets = []
+    offset = 0
+    for (name, code) in layout.fields(size):
+        names.append(name)
+        formats.append('S' + code[:-1] if code.endswith('s') else _DTYPES[code])
+        offsets.append(offset)
+        offset += struct.calcsize('>' + code)
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': size})
+
+
+def _dedupe(array: np.ndarray) -> np.ndarray:
+    """Drop all but the last copy of each frame. Frames are re-sent when a netplay game rolls back."""
+
+    frames = array['frame']
+    if len(frames) > 1 and not (np.diff(frames) > 0).all():
+        (_, last) = np.unique(frames[::-1], return_index=True)
+        array = array[len(array) - 1 - last]
+    return array
+
+
+class Columns(Base):
+    """Pre- or post-frame data for one character, as one NumPy array per field. Fields have the same names as the corresponding payload fields in the Slippi spec, e.g. `post.position_x`.
+
+    Element `i` of every column belongs to frame `frame[i]`. A leader has data for every frame, so for leaders `i` is also the index into :py:attr:`slippi.game.Game.frames`. Followers (Nana) can be missing frames."""
+
+    __slots__ = 'array', '_extra'
+
+    array: np.ndarray #: Underlying big-endian structured array, one record per frame
+
+    def __init__(self, array: np.ndarray):
+        self.array = array
+        self._extra: Dict[str, np.ndarray] = {}
+
+        names = array.dtype.names or ()
+        if 'flags' in names:
+            # five little-endian bytes, which NumPy has no type for
+            raw = np.frombuffer(array['flags'].tobytes(), 'u1').reshape(-1, 5).astype('u8')
+            self._extra['flags'] = (raw << np.arange(0, 40, 8, dtype='u8')).sum(axis=1)
+
+    def __getattr__(self, name):
+        # private names are never columns (and `_extra` doesn't exist yet while unpickling)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try: return self._extra[name]
+        except KeyError: pass
+        try: return self.array[name]
+        except (KeyError, ValueError): raise AttributeError(name) from None
+
+    def __len__(self):
+        return len(self.array)
+
+    def __repr__(self):
+        return 'Columns(%d frames: %s)' % (len(self.array), ', '.join(self.array.dtype.names or ()))
+
+
+class ColumnarGame(Base):
+    """Replay data from a game of Super Smash Brothers Melee, with frame data stored as columns instead of :py:class:`slippi.event.Frame` objects.
+
+    All pre- and post-frame payloads for a character are copied into one buffer while parsing, then decoded in a single vectorized pass. This uses a small fraction of the memory of :py:class:`slippi.game.Game`, but values are raw numbers (e.g. action states aren't converted to enums)."""
+
+    start: Optional[Start] #: Information about the start of the game
+    ports: Tuple[Optional[ColumnarGame.Port], ...] #: Frame data for each port (port 1 is at index 0; empty ports will contain None)
+    end: Optional[End] #: Information about the end of the game
+    metadata: Optional[Metadata] #: Miscellaneous data not directly provided by Melee
+    metadata_raw: Optional[dict] #: Raw JSON metadata, for debugging and forward-compatibility
+
+    def __init__(self, input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], use_mmap: bool = False):
+        """Parse a Slippi replay.
+
+        :param input: replay file object, path, or in-memory replay data
+        :param use_mmap: when true and `input` is a path, memory-map the file instead of reading it"""
+        self.start = None
+        self.ports = (None, None, None, None)
+        self.end = None
+        self.metadata = None
+        self.metadata_raw = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+        with _open(input, use_mmap) as reader:
+            self._parse(reader)
+
+    def close(self) -> None:
+        """Release the shared memory holding this game's columns, if any (see :py:func:`slippi.batch.parse_many`'s `'columnar'` mode). The game's :py:attr:`ports` are cleared. Columns taken from it earlier stay usable, and the memory is released once the last of them is gone. Games that aren't in shared memory don't need closing, and neither do shared ones: the memory is also released once the game and all its columns have been garbage collected."""
+        if self._shm is not None:
+            self.ports = (None, None, None, None)
+            (shm, self._shm) = (self._shm, None)
+            # The block is already unlinked, so views that are still alive just keep the mapping open until they go.
+            try: shm.close()
+            except BufferError: pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _parse(self, reader) -> None:
+        (payload_sizes, total_size) = _parse_header(reader)
+
+        pre = EventType.FRAME_PRE.value
+        post = EventType.FRAME_POST.value
+        buffers: Dict[Tuple[int, int, int], bytearray] = {}
+
+        # Same loop as `slippi.parse._parse_events`, minus the per-frame objects.
+        bytes_read = 0
+        while total_size == 0 or bytes_read < total_size:
+            code = reader.byte()
+            try: size = payload_sizes[code]
+            except KeyError: raise ValueError('unexpected event type: 0x%02x' % code)
+            bytes_read += 1 + size
+
+            if code != pre and code != post and code != EventType.GAME_START.value and code != EventType.GAME_END.value:
+                reader.skip(size)
+                continue
+
+            payload = reader.read(size)
+            if code == pre or code == post:
+                key = (code, payload[4], payload[5]) # port, is_follower
+                try: buffers[key] += payload
+                except KeyError: buffers[key] = bytearray(payload)
+            elif code == EventType.GAME_START.value:
+                self.start = Start._parse(payload)
+            elif code == EventType.GAME_END.value:
+                self.end = End._parse(payload)
+                break
+
+        arrays = []
+        for ((code, port, is_follower), buf) in sorted(buffers.items()):
+            layout = Frame.Port.Data.Pre._layout if code == pre else Frame.Port.Data.Post._layout
+            arrays.append(((port, bool(is_follower), 'pre' if code == pre else 'post'), _dedupe(np.frombuffer(buf, _dtype(layout, payload_sizes[code])))))
+        self._set_ports(arrays)
+
+        _parse_metadata(reader, {
+            ParseEvent.METADATA: lambda x: setattr(self, 'metadata', x),
+            ParseEvent.METADATA_RAW: lambda x: setattr(self, 'metadata_raw', x)})
+
+    def _set_ports(self, arrays: Iterable[Tuple[Tuple[int, bool, str], np.ndarray]]) -> None:
+        """Build :py:attr:`ports` from arrays keyed by `(port, is_follower, 'pre'|'post')`."""
+        ports: List[Optional[ColumnarGame.Port]] = [None, None, None, None]
+        for ((port, is_follower, kind), array) in arrays:
+            p = ports[port]
+            if p is None:
+                p = ports[port] = self.Port()
+            if is_follower:
+                if p.follower is None:
+                    p.follower = self.Port.Data()
+                data = p.follower
+            else:
+                data = p.leader
+            setattr(data, kind, Columns(array))
+        self.ports = tuple(ports)
+
+    def _share(self) -> SharedColumnarGame:
+        """Copy all columns into one new shared memory block, for another process to pick up (see :py:class:`SharedColumnarGame`)."""
+        arrays = []
+        for (i, p) in enumerate(self.ports):
+            if p is not None:
+                for (is_follower, data) in ((False, p.leader), (True, p.follower)):
+                    if data is not None:
+                        for kind in ('pre', 'post'):
+                            columns = getattr(data, kind)
+                            if columns is not None:
+                                arrays.append(((i, is_follower, kind), np.ascontiguousarray(columns.array)))
+
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, sum(a.nbytes for (_, a) in arrays)))
+        try:
+            buf = shm.buf
+            assert buf is not None
+            layout = []
+            offset = 0
+            for (key, array) in arrays:
+                buf[offset:offset + array.nbytes] = array.view('u1').data
+                layout.append((key, array.dtype, len(array), offset))
+                offset += array.nbytes
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        # The block outlives this handle: it's unlinked by whoever attaches to it.
+        shm.close()
+        return SharedColumnarGame(shm.name, layout, self.start, self.end, self.metadata, self.metadata_raw)
+
+    def _attr_repr(self, attr):
+        if attr == 'metadata_raw':
+            return None
+        else:
+            return super()._attr_repr(attr)
+
+
+    class Port(Base):
+        """Columnar frame data for a given port. Can include two characters' frame data (ICs)."""
+
+        leader: ColumnarGame.Port.Data #: Frame data for the controlled character
+        follower: Optional[ColumnarGame.Port.Data] #: Frame data for the follower (Nana), if any
+
+        def __init__(self):
+            self.leader = self.Data()
+            self.follower = None
+
+
+        class Data(Base):
+            """Columnar frame data for a given character."""
+
+            pre: Optional[Columns] #: Pre-frame update data
+            post: Optional[Columns] #: Post-frame update data
+
+            def __init__(self):
+                self.pre = None
+                self.post = None
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_block():
+    """`SharedMemory` subclass for attached blocks, defined on first use."""
+
+    from multiprocessing import shared_memory
+
+    class _SharedBlock(shared_memory.SharedMemory):
+        def __del__(self):
+            # Closing fails while NumPy views of the block are still alive. That's fine:
+            # the views keep the mapping open, and it goes away along with them.
+            try: self.close()
+            except BufferError: pass
+
+    return _SharedBlock
+
+
+class SharedColumnarGame(Base):
+    """Small, picklable handle to a :py:class:`ColumnarGame` whose columns are in a shared memory block. Used by :py:func:`slippi.batch.parse_many` to hand games from worker processes to the parent without pickling the columns.
+
+    Sharing requires Python 3.8 or later. The block stays allocated until it's attached. Attaching unlinks it, so from then on it's freed automatically once the attached game and its columns are gone (or explicitly, with :py:meth:`ColumnarGame.close`)."""
+
+    __slots__ = 'name', 'layout', 'start', 'end', 'metadata', 'metadata_raw'
+
+    def __init__(self, name: str, layout: List[Tuple[Tuple[int, bool, str], np.dtype, int, int]], start: Optional[Start], end: Optional[End], metadata: Optional[Metadata], metadata_raw: Optional[dict]):
+        self.name = name #: Shared memory block name
+        self.layout = layout #: `(key, dtype, length, offset)` of each column array in the block
+        self.start = start
+        self.end = end
+        self.metadata = metadata
+        self.metadata_raw = metadata_raw
+
+    def attach(self) -> ColumnarGame:
+        """Map the shared memory block, and return a game whose columns are (zero-copy) views of it. Can only be called once."""
+        shm = _shared_block()(self.name)
+        shm.unlink()
+        buf = shm.buf
+        assert buf is not None
+
+        game = ColumnarGame.__new__(ColumnarGame)
+        game.start = self.start
+        game.end = self.end
+        game.metadata = self.metadata
+        game.metadata_raw = self.metadata_raw
+        game._shm = shm
+        game._set_ports((key, np.frombuffer(buf, dtype, length, offset)) for (key, dtype, length, offset) in self.layout)
+        return game
+
+    def _attr_repr(self, attr):
+        if attr in ('layout', 'metadata_raw'):
+            return None
+        else:
+            return super()._attr_repr(attr)
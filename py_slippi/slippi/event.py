@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional, Sequence, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
 from . import id as sid
 from .util import *
@@ -42,25 +42,23 @@ class Start(Base):
         self.is_pal = is_pal
         self.is_frozen_ps = is_frozen_ps
 
-    @classmethod
-    def _parse(cls, stream):
-        slippi_ = cls.Slippi._parse(stream)
-
-        stream.read(8)
-        (is_teams,) = unpack('?', stream)
+    _layout = Layout(
+        ('4B8x?5xH80x' + '4B5xB26x' * 4 + '72xL', 'major minor revision build is_teams stage ' + ' '.join('character{0} type{0} stocks{0} costume{0} team{0}'.format(i) for i in PORTS) + ' random_seed'),
+        ('8L', ' '.join('dash_back{0} shield_drop{0}'.format(i) for i in PORTS)), # v1.0.0
+        ('16s' * 4, ' '.join('tag%d' % i for i in PORTS)), # v1.3.0
+        ('?', 'is_pal'), # v1.5.0
+        ('?', 'is_frozen_ps')) # v2.0.0
 
-        stream.read(5)
-        (stage,) = unpack('H', stream)
+    @classmethod
+    def _parse(cls, buf):
+        values = cls._layout.struct(len(buf)).unpack_from(buf)
+        slippi_ = cls.Slippi(cls.Slippi.Version(*values[0:4]))
+        (is_teams, stage) = values[4:6]
         stage = sid.Stage.parse_stage_id(stage)
 
-        stream.read(80)
         players = []
         for i in PORTS:
-            (character, type, stocks, costume) = unpack('BBBB', stream)
-
-            stream.read(5)
-            (team,) = unpack('B', stream)
-            stream.read(26)
+            (character, type, stocks, costume, team) = values[6 + 5 * i : 11 + 5 * i]
 
             try: type = cls.Player.Type(type)
             except ValueError: type = None
@@ -74,36 +72,28 @@ class Start(Base):
 
             players.append(player)
 
-        stream.read(72)
-        (random_seed,) = unpack('L', stream)
+        random_seed = values[26]
 
-        try: # v1.0.0
+        if len(values) > 27: # v1.0.0
             for i in PORTS:
-                (dash_back, shield_drop) = unpack('LL', stream)
+                (dash_back, shield_drop) = values[27 + 2 * i : 29 + 2 * i]
                 dash_back = cls.Player.UCF.DashBack(dash_back)
                 shield_drop = cls.Player.UCF.ShieldDrop(shield_drop)
                 if players[i]:
                     players[i].ucf = cls.Player.UCF(dash_back, shield_drop)
-        except EOFError: pass
 
-        try: # v1.3.0
+        if len(values) > 35: # v1.3.0
             for i in PORTS:
-                tag_bytes = stream.read(16)
+                tag_bytes = values[35 + i]
                 if players[i]:
                     try:
                         null_pos = tag_bytes.index(0)
                         tag_bytes = tag_bytes[:null_pos]
                     except ValueError: pass
                     players[i].tag = tag_bytes.decode('shift-jis').rstrip()
-        except EOFError: pass
 
-        # v1.5.0
-        try: (is_pal,) = unpack('?', stream)
-        except EOFError: is_pal = None
-
-        # v2.0.0
-        try: (is_frozen_ps,) = unpack('?', stream)
-        except EOFError: is_frozen_ps = None
+        is_pal = values[39] if len(values) > 39 else None # v1.5.0
+        is_frozen_ps = values[40] if len(values) > 40 else None # v2.0.0
 
         return cls(
             is_teams=is_teams,
@@ -128,10 +118,6 @@ class Start(Base):
         def __init__(self, version: Start.Slippi.Version):
             self.version = version
 
-        @classmethod
-        def _parse(cls, stream):
-            return cls(cls.Version(*unpack('BBBB', stream)))
-
         def __eq__(self, other):
             if not isinstance(other, self.__class__):
                 return NotImplemented
@@ -166,7 +152,7 @@ class Start(Base):
         costume: int #: Costume ID
         team: Optional[Start.Player.Team] #: Team, if this was a teams game
         ucf: Start.Player.UCF #: UCF feature toggles
-        tag: Optional[str] #: Name tag
+        tag: Optional[str] #: `added(1.3.0)` Name tag
 
         def __init__(self, character: sid.CSSCharacter, type: Start.Player.Type, stocks: int, costume: int, team: Optional[Start.Player.Team], ucf: Optional[Start.Player.UCF] = None, tag: Optional[str] = None):
             self.character = character
@@ -230,15 +216,15 @@ class End(Base):
         self.method = method
         self.lras_initiator = lras_initiator
 
+    _layout = Layout(
+        ('B', 'method'),
+        ('B', 'lras_initiator')) # v2.0.0
+
     @classmethod
-    def _parse(cls, stream):
-        (method,) = unpack('B', stream)
-        try: # v2.0.0
-            (lras,) = unpack('B', stream)
-            lras_initiator = lras if lras < len(PORTS) else None
-        except EOFError:
-            lras_initiator = None
-        return cls(cls.Method(method), lras_initiator)
+    def _parse(cls, buf):
+        values = cls._layout.struct(len(buf)).unpack_from(buf)
+        lras_initiator = values[1] if len(values) > 1 and values[1] < len(PORTS) else None
+        return cls(cls.Method(values[0]), lras_initiator)
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
@@ -260,24 +246,42 @@ class End(Base):
 class Frame(Base):
     """A single frame of the game. Includes data for all characters."""
 
-    __slots__ = 'index', 'ports', 'items', 'start', 'end'
+    __slots__ = 'index', 'ports', '_items', '_start', '_end'
 
     index: int
     ports: Sequence[Optional[Frame.Port]] #: Frame data for each port (port 1 is at index 0; empty ports will contain None)
-    items: Sequence[Frame.Item] #: `added(3.0.0)` Active items (includes projectiles)
-    start: Optional[Frame.Start] #: `added(2.2.0)` Start-of-frame data
-    end: Optional[Frame.End] #: `added(2.2.0)` End-of-frame data
 
     def __init__(self, index: int):
         self.index = index
         self.ports = [None, None, None, None]
-        self.items = []
-        self.start = None
-        self.end = None
+        self._items: Union[List[Any], Tuple[Frame.Item, ...]] = []
+        self._start = None
+        self._end = None
 
     def _finalize(self):
         self.ports = tuple(self.ports)
-        self.items = tuple(self.items)
+
+    @property
+    def items(self) -> Sequence[Frame.Item]:
+        """`added(3.0.0)` Active items (includes projectiles)"""
+        # raw payloads are collected in a list, decoded items are kept in a tuple
+        if isinstance(self._items, list):
+            self._items = tuple(i if isinstance(i, self.Item) else self.Item._parse(i) for i in self._items)
+        return self._items
+
+    @property
+    def start(self) -> Optional[Frame.Start]:
+        """`added(2.2.0)` Start-of-frame data"""
+        if self._start and not isinstance(self._start, self.Start):
+            self._start = self.Start._parse(self._start)
+        return self._start
+
+    @property
+    def end(self) -> Optional[Frame.End]:
+        """`added(2.2.0)` End-of-frame data"""
+        if self._end and not isinstance(self._end, self.End):
+            self._end = self.End._parse(self._end)
+        return self._end
 
 
     class Port(Base):
@@ -345,26 +349,27 @@ class Frame(Base):
                     self.raw_analog_x = raw_analog_x #: int | None: `added(1.2.0)` Raw x analog controller input (for UCF)
                     self.damage = damage #: float | None: `added(1.4.0)` Current damage percent
 
-                @classmethod
-                def _parse(cls, stream):
-                    (random_seed, state, position_x, position_y, direction, joystick_x, joystick_y, cstick_x, cstick_y, trigger_logical, buttons_logical, buttons_physical, trigger_physical_l, trigger_physical_r) = unpack('LHffffffffLHff', stream)
-
-                    # v1.2.0
-                    try: (raw_analog_x,) = unpack('B', stream)
-                    except EOFError: raw_analog_x = None
+                _layout = Layout(
+                    ('iB?LHffffffffLHff', 'frame port is_follower random_seed state position_x position_y direction joystick_x joystick_y cstick_x cstick_y trigger_logical buttons_logical buttons_physical trigger_physical_l trigger_physical_r'),
+                    ('B', 'raw_analog_x'), # v1.2.0
+                    ('f', 'damage')) # v1.4.0
 
-                    # v1.4.0
-                    try: (damage,) = unpack('f', stream)
-                    except EOFError: damage = None
+                @classmethod
+                def _parse(cls, buf):
+                    values = cls._layout.struct(len(buf)).unpack_from(buf)
+                    (random_seed, state, position_x, position_y, direction, joystick_x, joystick_y, cstick_x, cstick_y, trigger_logical, buttons_logical, buttons_physical, trigger_physical_l, trigger_physical_r) = values[3:17]
+                    raw_analog_x = values[17] if len(values) > 17 else None
+                    damage = values[18] if len(values) > 18 else None
 
+                    states = _ACTION_STATES or _action_states()
                     return cls(
-                        state=try_enum(sid.ActionState, state),
-                        position=Position(position_x, position_y),
+                        state=states[state] if state < len(states) else state,
+                        position=_tuple(Position, (position_x, position_y)),
                         direction=Direction(direction),
-                        joystick=Position(joystick_x, joystick_y),
-                        cstick=Position(cstick_x, cstick_y),
-                        triggers=Triggers(trigger_logical, trigger_physical_l, trigger_physical_r),
-                        buttons=Buttons(buttons_logical, buttons_physical),
+                        joystick=_tuple(Position, (joystick_x, joystick_y)) if joystick_x or joystick_y else _ORIGIN,
+                        cstick=_tuple(Position, (cstick_x, cstick_y)) if cstick_x or cstick_y else _ORIGIN,
+                        triggers=_triggers(trigger_logical, trigger_physical_l, trigger_physical_r),
+                        buttons=_buttons(buttons_logical, buttons_physical),
                         random_seed=random_seed,
                         raw_analog_x=raw_analog_x,
                         damage=damage)
@@ -375,7 +380,7 @@ class Frame(Base):
 
                 __slots__ = 'character', 'state', 'position', 'direction', 'damage', 'shield', 'stocks', 'last_attack_landed', 'last_hit_by', 'combo_count', 'state_age', 'flags', 'hit_stun', 'airborne', 'ground', 'jumps', 'l_cancel'
 
-                character: sid.InGameCharacter #: In-game character (can only change for Zelda/Sheik). Check on first frame to determine if Zelda started as Sheik
+                character: Union[sid.InGameCharacter, int] #: In-game character (can only change for Zelda/Sheik). Check on first frame to determine if Zelda started as Sheik
                 state: Union[sid.ActionState, int] #: Character's action state
                 position: Position #: Character's position
                 direction: Direction #: Direction the character is facing
@@ -393,7 +398,7 @@ class Frame(Base):
                 jumps: Optional[int] #: `added(2.0.0)` Jumps remaining
                 l_cancel: Optional[LCancel] #: `added(2.0.0)` L-cancel status, if any
 
-                def __init__(self, character: sid.InGameCharacter, state: Union[sid.ActionState, int], position: Position, direction: Direction, damage: float, shield: float, stocks: int, last_attack_landed: Union[Attack, int], last_hit_by: Optional[int], combo_count: int, state_age: Optional[float] = None, flags: Optional[StateFlags] = None, hit_stun: Optional[float] = None, airborne: Optional[bool] = None, ground: Optional[int] = None, jumps: Optional[int] = None, l_cancel: Optional[LCancel] = None):
+                def __init__(self, character: Union[sid.InGameCharacter, int], state: Union[sid.ActionState, int], position: Position, direction: Direction, damage: float, shield: float, stocks: int, last_attack_landed: Union[Attack, int], last_hit_by: Optional[int], combo_count: int, state_age: Optional[float] = None, flags: Optional[StateFlags] = None, hit_stun: Optional[float] = None, airborne: Optional[bool] = None, ground: Optional[int] = None, jumps: Optional[int] = None, l_cancel: Optional[LCancel] = None):
                     self.character = character
                     self.state = state
                     self.position = position
@@ -412,38 +417,37 @@ class Frame(Base):
                     self.jumps = jumps
                     self.l_cancel = l_cancel
 
+                _layout = Layout(
+                    ('iB?BHfffffBBBB', 'frame port is_follower character state position_x position_y direction damage shield last_attack_landed combo_count last_hit_by stocks'),
+                    ('f', 'state_age'), # v0.2.0
+                    ('5sf?HBB', 'flags misc_as airborne ground jumps l_cancel')) # v2.0.0
+
                 @classmethod
-                def _parse(cls, stream):
-                    (character, state, position_x, position_y, direction, damage, shield, last_attack_landed, combo_count, last_hit_by, stocks) = unpack('BHfffffBBBB', stream)
-
-                    # v0.2.0
-                    try: (state_age,) = unpack('f', stream)
-                    except EOFError: state_age = None
-
-                    try: # v2.0.0
-                        flags = unpack('5B', stream)
-                        (misc_as, airborne, maybe_ground, jumps, l_cancel) = unpack('f?HBB', stream)
-                        flags = StateFlags(flags[0] +
-                                           flags[1] * 2**8 +
-                                           flags[2] * 2**16 +
-                                           flags[3] * 2**24 +
-                                           flags[4] * 2**32)
+                def _parse(cls, buf):
+                    values = cls._layout.struct(len(buf)).unpack_from(buf)
+                    (character, state, position_x, position_y, direction, damage, shield, last_attack_landed, combo_count, last_hit_by, stocks) = values[3:14]
+                    state_age = values[14] if len(values) > 14 else None
+
+                    if len(values) > 15:
+                        (flags, misc_as, airborne, maybe_ground, jumps, l_cancel) = values[15:21]
+                        flags = StateFlags(int.from_bytes(flags, 'little'))
                         ground = maybe_ground if not airborne else None
                         hit_stun = misc_as if flags.HIT_STUN else None
                         l_cancel = LCancel(l_cancel) if l_cancel else None
-                    except EOFError:
+                    else:
                         (flags, hit_stun, airborne, ground, jumps, l_cancel) = [None] * 6
 
+                    states = _ACTION_STATES or _action_states()
                     return cls(
-                        character=sid.InGameCharacter(character),
-                        state=try_enum(sid.ActionState, state),
+                        character=_CHARACTERS[character] if character < len(_CHARACTERS) else character,
+                        state=states[state] if state < len(states) else state,
                         state_age=state_age,
-                        position=Position(position_x, position_y),
+                        position=_tuple(Position, (position_x, position_y)),
                         direction=Direction(direction),
                         damage=damage,
                         shield=shield,
                         stocks=stocks,
-                        last_attack_landed=try_enum(Attack, last_attack_landed) if last_attack_landed else None,
+                        last_attack_landed=(_ATTACKS[last_attack_landed] if last_attack_landed < len(_ATTACKS) else last_attack_landed) if last_attack_landed else None,
                         last_hit_by=last_hit_by if last_hit_by < 4 else None,
                         combo_count=combo_count,
                         flags=flags,
@@ -459,7 +463,7 @@ class Frame(Base):
 
         __slots__ = 'type', 'state', 'direction', 'velocity', 'position', 'damage', 'timer', 'spawn_id'
 
-        type: sid.Item #: Item type
+        type: Union[sid.Item, int] #: Item type
         state: int #: Item's action state
         direction: Direction #: Direction item is facing
         velocity: Velocity #: Item's velocity
@@ -468,7 +472,7 @@ class Frame(Base):
         timer: int #: Frames remaining until item expires
         spawn_id: int #: Unique ID per item spawned (0, 1, 2, ...)
 
-        def __init__(self, type: sid.Item, state: int, direction: Direction, velocity: Velocity, position: Position, damage: int, timer: int, spawn_id: int):
+        def __init__(self, type: Union[sid.Item, int], state: int, direction: Direction, velocity: Velocity, position: Position, damage: int, timer: int, spawn_id: int):
             self.type = type
             self.state = state
             self.direction = direction
@@ -478,15 +482,18 @@ class Frame(Base):
             self.timer = timer
             self.spawn_id = spawn_id
 
+        _layout = Layout(('iHB5fHfI', 'frame type state direction velocity_x velocity_y position_x position_y damage timer spawn_id'))
+
         @classmethod
-        def _parse(cls, stream):
-            (type, state, direction, x_vel, y_vel, x_pos, y_pos, damage, timer, spawn_id) = unpack('HB5fHfI', stream)
+        def _parse(cls, buf):
+            (_, type, state, direction, x_vel, y_vel, x_pos, y_pos, damage, timer, spawn_id) = cls._layout.struct(len(buf)).unpack_from(buf)
+            items = _ITEMS or _items()
             return cls(
-                type=try_enum(sid.Item, type),
+                type=items[type] if type < len(items) else type,
                 state=state,
                 direction=Direction(direction) if direction != 0 else None,
-                velocity=Velocity(x_vel, y_vel),
-                position=Position(x_pos, y_pos),
+                velocity=_tuple(Velocity, (x_vel, y_vel)) if x_vel or y_vel else _STILL,
+                position=_tuple(Position, (x_pos, y_pos)),
                 damage=damage,
                 timer=timer,
                 spawn_id=spawn_id)
@@ -507,10 +514,11 @@ class Frame(Base):
         def __init__(self, random_seed: int):
             self.random_seed = random_seed
 
+        _layout = Layout(('iI', 'frame random_seed'))
+
         @classmethod
-        def _parse(cls, stream):
-            (random_seed,) = unpack('I', stream)
-            random_seed = random_seed
+        def _parse(cls, buf):
+            (_, random_seed) = cls._layout.struct(len(buf)).unpack_from(buf)
             return cls(random_seed)
 
         def __eq__(self, other):
@@ -526,7 +534,7 @@ class Frame(Base):
             pass
 
         @classmethod
-        def _parse(cls, stream):
+        def _parse(cls, buf):
             return cls()
 
         def __eq__(self, other):
@@ -549,15 +557,19 @@ class Frame(Base):
         class Id(Base):
             __slots__ = 'frame'
 
-            def __init__(self, stream):
-                (self.frame,) = unpack('i', stream)
+            _struct = struct.Struct('>i')
+
+            def __init__(self, buf):
+                (self.frame,) = self._struct.unpack_from(buf)
 
 
         class PortId(Id):
             __slots__ = 'port', 'is_follower'
 
-            def __init__(self, stream):
-                (self.frame, self.port, self.is_follower) = unpack('iB?', stream)
+            _struct = struct.Struct('>iB?')
+
+            def __init__(self, buf):
+                (self.frame, self.port, self.is_follower) = self._struct.unpack_from(buf)
 
 
         class Type(Enum):
@@ -568,39 +580,49 @@ class Frame(Base):
             ITEM = 'item'
 
 
-class Position(Base):
-    __slots__ = 'x', 'y'
+class Position(NamedTuple):
+    """An immutable `(x, y)` pair. Decoded stick positions (:py:attr:`Frame.Port.Data.Pre.joystick` & `cstick`) equal to (0, 0), i.e. neutral, are all the same object."""
 
     x: float
     y: float
 
-    def __init__(self, x: float, y: float):
-        self.x = x
-        self.y = y
-
+    # Only equal to others of the same class, not to plain tuples (or other pairs) with the same values.
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
-            return NotImplemented
-        return self.x == other.x and self.y == other.y
+            return False if isinstance(other, tuple) else NotImplemented
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        if not isinstance(other, self.__class__):
+            return True if isinstance(other, tuple) else NotImplemented
+        return tuple.__ne__(self, other)
+
+    def __hash__(self):
+        return tuple.__hash__(self)
 
     def __repr__(self):
         return '(%.2f, %.2f)' % (self.x, self.y)
 
 
-class Velocity(Base):
-    __slots__ = 'x', 'y'
+class Velocity(NamedTuple):
+    """An immutable `(x, y)` pair. Decoded item velocities equal to (0, 0) are all the same object."""
 
     x: float
     y: float
 
-    def __init__(self, x: float, y: float):
-        self.x = x
-        self.y = y
-
+    # Only equal to others of the same class, not to plain tuples (or other pairs) with the same values.
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
-            return NotImplemented
-        return self.x == other.x and self.y == other.y
+            return False if isinstance(other, tuple) else NotImplemented
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        if not isinstance(other, self.__class__):
+            return True if isinstance(other, tuple) else NotImplemented
+        return tuple.__ne__(self, other)
+
+    def __hash__(self):
+        return tuple.__hash__(self)
 
     def __repr__(self):
         return '(%.2f, %.2f)' % (self.x, self.y)
@@ -705,14 +727,22 @@ class Attack(IntEnum):
 
 
 class Triggers(Base):
+    """Immutable, as decoded values are shared between frames."""
+
     __slots__ = 'logical', 'physical'
 
     logical: float #: Processed analog trigger position
     physical: Triggers.Physical #: Physical analog trigger positions (useful for APM)
 
     def __init__(self, logical: float, physical_x: float, physical_y: float):
-        self.logical = logical
-        self.physical = self.Physical(physical_x, physical_y)
+        _set(self, 'logical', logical)
+        _set(self, 'physical', self.Physical(physical_x, physical_y))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("can't set attribute")
+
+    def __reduce__(self):
+        return (self.__class__, (self.logical, self.physical.l, self.physical.r))
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
@@ -727,8 +757,14 @@ class Triggers(Base):
         r: float
 
         def __init__(self, l: float, r: float):
-            self.l = l
-            self.r = r
+            _set(self, 'l', l)
+            _set(self, 'r', r)
+
+        def __setattr__(self, name, value):
+            raise AttributeError("can't set attribute")
+
+        def __reduce__(self):
+            return (self.__class__, (self.l, self.r))
 
         def __eq__(self, other):
             if not isinstance(other, self.__class__):
@@ -738,14 +774,22 @@ class Triggers(Base):
 
 
 class Buttons(Base):
+    """Immutable, as decoded values are shared between frames."""
+
     __slots__ = 'logical', 'physical'
 
     logical: Buttons.Logical #: Processed button-state bitmask
     physical: Buttons.Physical #: Physical button-state bitmask
 
     def __init__(self, logical, physical):
-        self.logical = self.Logical(logical)
-        self.physical = self.Physical(physical)
+        _set(self, 'logical', _flag(self.Logical, _LOGICAL, logical))
+        _set(self, 'physical', _flag(self.Physical, _PHYSICAL, physical))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("can't set attribute")
+
+    def __reduce__(self):
+        return (self.__class__, (self.logical.value, self.physical.value))
 
     def __eq__(self, other):
         if not isinstance(other, Buttons):
@@ -820,3 +864,69 @@ class StateFlags(IntFlag):
     SLEEP = 2**36
     DEAD = 2**38
     OFF_SCREEN = 2**39
+
+
+# Lookup tables for enums decoded on every frame. Values that aren't members (e.g. character-specific action states) pass through as ints.
+# Tables for the enums in `slippi._id` start out empty, and are only built (loading those enums) on first use.
+_ACTION_STATES: tuple = ()
+_ATTACKS = enum_table(Attack)
+_CHARACTERS = enum_table(sid.InGameCharacter)
+_ITEMS: tuple = ()
+
+
+# Decoded values that repeat from frame to frame, shared instead of being created again. Keyed by raw values.
+_ORIGIN = Position(0.0, 0.0)
+_STILL = Velocity(0.0, 0.0)
+_BUTTONS: Dict[int, Buttons] = {} # by `logical << 16 | physical`
+_TRIGGERS: Dict[Tuple[float, float, float], Triggers] = {}
+_LOGICAL: Dict[int, Buttons.Logical] = {}
+_PHYSICAL: Dict[int, Buttons.Physical] = {}
+
+# Caches are emptied when they reach this size, in case some replay has an unusual variety of values.
+_CACHE_SIZE = 4096
+
+_set = object.__setattr__
+_tuple = tuple.__new__
+
+
+def _flag(cls, cache, value):
+    flag = cache.get(value)
+    if flag is None:
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+        flag = cache[value] = cls(value)
+    return flag
+
+
+def _buttons(logical, physical):
+    key = logical << 16 | physical
+    buttons = _BUTTONS.get(key)
+    if buttons is None:
+        if len(_BUTTONS) >= _CACHE_SIZE:
+            _BUTTONS.clear()
+        buttons = _BUTTONS[key] = Buttons(logical, physical)
+    return buttons
+
+
+def _triggers(logical, l, r):
+    key = (logical, l, r)
+    triggers = _TRIGGERS.get(key)
+    if triggers is None:
+        if len(_TRIGGERS) >= _CACHE_SIZE:
+            _TRIGGERS.clear()
+        triggers = _TRIGGERS[key] = Triggers(logical, l, r)
+    return triggers
+
+
+def _action_states() -> tuple:
+    global _ACTION_STATES
+    if not _ACTION_STATES:
+        _ACTION_STATES = enum_table(sid.ActionState)
+    return _ACTION_STATES
+
+
+def _items() -> tuple:
+    global _ITEMS
+    if not _ITEMS:
+        _ITEMS = enum_table(sid.Item)
+    return _ITEMS
@@ -1,31 +1,189 @@
-import io, os
-from logging import debug
-from typing import BinaryIO, List, Optional, Union
+import array, collections, io, os
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union, cast, overload
 
-from .event import FIRST_FRAME_INDEX, End, Frame, Start
+from .event import FIRST_FRAME_INDEX, End, EventType, Frame, Start
+from .index import FrameIndex, build_index, read_frames
 from .metadata import Metadata
-from .parse import ParseEvent, parse
+from .parse import ParseEvent, ParseStats, parse
 from .util import *
 
 
+class FrameStore(Base, Sequence[Frame]):
+    """Compact storage for a game's frames: every frame's raw events, back to back in one buffer, plus a table of where each frame starts and ends. This takes up about as much memory as the replay's frame data.
+
+    Indexing (or iterating) builds a :py:class:`slippi.event.Frame` from the frame's events on demand. By default the store doesn't keep it: each access returns a new frame, and decodes its data again. With a `cache_size`, the most recently accessed frames are kept (along with whatever data has been decoded from them), up to that many."""
+
+    __slots__ = '_data', '_starts', '_ends', '_sizes', '_cache', '_cache_size'
+
+    _PRE = EventType.FRAME_PRE.value
+    _POST = EventType.FRAME_POST.value
+    _ITEM = EventType.ITEM.value
+    _START = EventType.FRAME_START.value
+    _END = EventType.FRAME_END.value
+
+    def __init__(self, cache_size: int = 0):
+        """:param cache_size: number of recently accessed frames to keep"""
+        self._data = bytearray()
+        self._starts = array.array('I')
+        self._ends = array.array('I')
+        self._sizes: Dict[int, int] = {} # payload size, by event code
+        self._cache: Optional[collections.OrderedDict] = collections.OrderedDict() if cache_size > 0 else None # index -> frame, least recently used first
+        self._cache_size = cache_size
+
+    def __len__(self):
+        return len(self._starts)
+
+    @overload
+    def __getitem__(self, i: int) -> Frame: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[Frame]: ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('frame index out of range')
+        return self._get(i)
+
+    def __iter__(self) -> Iterator[Frame]:
+        for i in range(len(self)):
+            yield self._get(i)
+
+    def __setitem__(self, i: int, frame: Frame) -> None:
+        """Replace a frame (e.g. one that's been re-sent due to rollback). Its events are appended to the buffer, and the old ones are left unused."""
+        if i < 0:
+            i += len(self)
+        (self._starts[i], self._ends[i]) = self._add(frame)
+        if self._cache is not None:
+            self._cache.pop(i, None)
+
+    def append(self, frame: Frame) -> None:
+        """Add a frame. It must have come straight from the parser, with its data still undecoded."""
+        (start, end) = self._add(frame)
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def __repr__(self):
+        return '[...](%d)' % len(self)
+
+    def _add(self, frame):
+        events = []
+        if frame._start is not None:
+            events.append((self._START, frame._start))
+        for port in frame.ports:
+            if port is not None:
+                for d in (port.leader, port.follower):
+                    if d is not None:
+                        if d._pre is not None:
+                            events.append((self._PRE, d._pre))
+                        if d._post is not None:
+                            events.append((self._POST, d._post))
+        events.extend((self._ITEM, item) for item in frame._items)
+        if frame._end is not None:
+            events.append((self._END, frame._end))
+
+        data = self._data
+        start = len(data)
+        for (code, payload) in events:
+            data.append(code)
+            data += payload
+            self._sizes[code] = len(payload)
+        return (start, len(data))
+
+    def _get(self, i):
+        cache = self._cache
+        if cache is None:
+            return self._frame(i)
+        try: frame = cache[i]
+        except KeyError:
+            frame = cache[i] = self._frame(i)
+            if len(cache) > self._cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(i)
+        return frame
+
+    def _frame(self, i):
+        data = self._data
+        sizes = self._sizes
+        pos = self._starts[i]
+        end = self._ends[i]
+
+        frame = Frame(FIRST_FRAME_INDEX + i)
+        ports = frame.ports
+        while pos < end:
+            code = data[pos]
+            pos += 1
+            payload = data[pos:pos + sizes[code]]
+            pos += len(payload)
+            if code == self._PRE or code == self._POST:
+                port = ports[payload[4]]
+                if port is None:
+                    port = ports[payload[4]] = Frame.Port()
+                if payload[5]: # follower
+                    if port.follower is None:
+                        port.follower = Frame.Port.Data()
+                    d = port.follower
+                else:
+                    d = port.leader
+                if code == self._PRE:
+                    d._pre = payload
+                else:
+                    d._post = payload
+            elif code == self._ITEM:
+                frame._items.append(payload)
+            elif code == self._START:
+                frame._start = payload
+            else:
+                frame._end = payload
+        frame._finalize()
+        return frame
+
+
 class Game(Base):
     """Replay data from a game of Super Smash Brothers Melee."""
 
     start: Optional[Start] #: Information about the start of the game
-    frames: List[Frame] #: Every frame of the game, indexed by frame number
+    frames: Sequence[Frame] #: Every frame of the game, indexed by frame number. A list, or a :py:class:`FrameStore` if parsed with `compact`. With `keep_frames`, a :py:class:`collections.deque` of just the last frames, oldest first.
     end: Optional[End] #: Information about the end of the game
     metadata: Optional[Metadata] #: Miscellaneous data not directly provided by Melee
     metadata_raw: Optional[dict] #: Raw JSON metadata, for debugging and forward-compatibility
 
-    def __init__(self, input: Union[BinaryIO, str, os.PathLike], skip_frames: bool = False):
+    def __init__(self, input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], skip_frames: bool = False, use_mmap: bool = False, ports: Optional[Iterable[int]] = None, data: Iterable[str] = ('pre', 'post'), stats: Optional[ParseStats] = None, compact: bool = False, cache_frames: int = 0, keep_frames: Optional[int] = None):
         """Parse a Slippi replay.
 
-        :param input: replay file object or path"""
+        :param input: replay file object, path, or in-memory replay data
+        :param skip_frames: when true, skip past all frame data. File objects that can't seek are read through instead.
+        :param use_mmap: when true and `input` is a path, memory-map the file instead of reading it (see :py:func:`slippi.parse.parse`)
+        :param ports: if not None, only keep frame data for these ports (0-3); the rest are `None` in each frame's `ports`
+        :param data: which kinds of per-character frame data to keep: any of `'pre'` and `'post'`
+        :param stats: if not None, add statistics about parsing this replay to it (see :py:class:`slippi.parse.ParseStats`)
+        :param compact: when true, keep frames as raw event data in a :py:class:`FrameStore`, which uses a fraction of the memory. Frames are then rebuilt & decoded each time they're accessed, so changes made to them aren't kept.
+        :param cache_frames: with `compact`, keep up to this many recently accessed frames decoded, for code that accesses the same frames repeatedly. Memory use stays bounded either way, unlike with ordinary frames, which keep all their data once it's been decoded.
+        :param keep_frames: if not None, only keep this many frames: the last ones parsed. Memory use then doesn't grow with the length of the game. Frames re-sent due to rollback still replace earlier copies, as long as those are within the last `keep_frames` frames (rollbacks only go back a few frames)."""
+        if cache_frames and not compact:
+            raise ValueError('cache_frames requires compact')
+        if keep_frames is not None:
+            if keep_frames < 1:
+                raise ValueError('invalid keep_frames: %r' % keep_frames)
+            if compact:
+                raise ValueError('keep_frames and compact are mutually exclusive')
         self.start = None
-        self.frames = []
+        self.frames = collections.deque(maxlen=keep_frames) if keep_frames is not None else FrameStore(cache_frames) if compact else []
         self.end = None
         self.metadata = None
         self.metadata_raw = None
+        # kept for `frame_at`, when frames aren't parsed up front. Parsing leaves file objects at the end, so note where the replay starts.
+        self._input = input if skip_frames else None
+        self._input_pos: Optional[int] = None
+        if skip_frames and not isinstance(input, (bytes, bytearray, memoryview, str, os.PathLike)):
+            try: self._input_pos = input.tell() if input.seekable() else None
+            except AttributeError: pass # not all stream-like objects support `seekable`
+        self._index: Optional[FrameIndex] = None
+        self._stats = stats
+        self._frame_count = 0 # including frames no longer kept
 
         parse(input, {
             ParseEvent.START: lambda x: setattr(self, 'start', x),
@@ -33,22 +191,45 @@ class Game(Base):
             ParseEvent.END: lambda x: setattr(self, 'end', x),
             ParseEvent.METADATA: lambda x: setattr(self, 'metadata', x),
             ParseEvent.METADATA_RAW: lambda x: setattr(self, 'metadata_raw', x)},
-            skip_frames)
+            skip_frames, use_mmap, ports=ports, data=data, stats=stats)
+
+    def frame_at(self, i: int) -> Frame:
+        """Get a single frame, by index into :py:attr:`frames`.
+
+        If this game was parsed with `skip_frames`, the frame is read straight from the replay, seeking past all the frames before it (see :py:func:`slippi.index.read_frames`). In that case the replay must still be available: for a file object, it must still be open. Such games keep a reference to their input (so in-memory replay data isn't freed), and can only be pickled if the input was a path.
+
+        :param i: frame index (negative indexes count back from the last frame)"""
+        if self._input is None:
+            return self.frames[i]
+        if self._input_pos is not None:
+            cast(BinaryIO, self._input).seek(self._input_pos)
+        if self._index is None:
+            self._index = build_index(self._input)
+        frames = read_frames(self._input, i, i + 1 if i != -1 else None, self._index)
+        if not frames:
+            raise IndexError('frame index out of range')
+        return frames[0]
 
     def _add_frame(self, f):
         idx = f.index - FIRST_FRAME_INDEX
-        count = len(self.frames)
+        count = self._frame_count
         if idx == count:
             self.frames.append(f)
+            self._frame_count += 1
         elif idx < count: # rollback
-            debug(f"rollback: {count-1} -> {idx}")
-            self.frames[idx] = f
+            log.debug('rollback: %d -> %d', count-1, idx)
+            # position among the frames kept, which are the last `len(self.frames)`
+            i = idx - (count - len(self.frames))
+            if i >= 0:
+                self.frames[i] = f
+            if self._stats is not None:
+                self._stats.rollbacks += 1
         else:
             raise Exception(f'missing frames: {count-1} -> {idx}')
 
     def _attr_repr(self, attr):
         self_attr = getattr(self, attr)
-        if isinstance(self_attr, list):
+        if isinstance(self_attr, (list, collections.deque, FrameStore)):
             return '%s=[...](%d)' % (attr, len(self_attr))
         elif attr == 'metadata_raw':
             return None
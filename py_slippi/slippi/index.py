@@ -0,0 +1,267 @@
+"""Random access to frames, via an index of where each frame's events are in a replay. Indexes can be saved as sidecar files, so a replay only has to be scanned once."""
+
+from __future__ import annotations
+
+# `hashlib`, `json` & `tempfile` are imported where they're used, to keep `import slippi` fast.
+import array, os, sys
+from typing import BinaryIO, Dict, Iterable, List, Optional, Union
+
+from .event import FIRST_FRAME_INDEX, EventType, Frame
+from .metadata import Metadata
+from .parse import _ALL_DATA, _FRAME_EVENT_TYPES, ParseEvent, _open, _parse_events, _parse_header, _parse_metadata, _selection
+from .util import *
+
+
+class FrameIndex(Base):
+    """Byte offsets of every frame in a replay, from a single scan of its events (see :py:func:`build_index`).
+
+    Frames are indexed like :py:attr:`slippi.game.Game.frames`. In netplay replays a frame can be sent more than once, due to rollback; offsets are those of the last (i.e. correct) copy of each frame. The final copies of consecutive frames are always in order, so any range of frames can be read by parsing from the offset of its first frame to the offset of the frame after its last."""
+
+    __slots__ = 'payload_sizes', 'offsets', 'rollbacks', 'end', 'game_start', 'game_end', 'metadata_raw'
+
+    payload_sizes: Dict[int, int] #: Payload size for each event code, from the replay's header
+    offsets: array.array #: Byte offset of each frame's first event
+    rollbacks: array.array #: Number of times each frame was re-sent due to rollback
+    end: int #: Byte offset just past the last frame's events
+    game_start: Optional[int] #: Byte offset of the Game Start event
+    game_end: Optional[int] #: Byte offset of the Game End event (None for an in-progress replay)
+    metadata_raw: Optional[dict] #: The replay's raw JSON metadata, if any
+
+    def __init__(self, payload_sizes: Dict[int, int], offsets: array.array, rollbacks: array.array, end: int, game_start: Optional[int] = None, game_end: Optional[int] = None, metadata_raw: Optional[dict] = None):
+        self.payload_sizes = payload_sizes
+        self.offsets = offsets
+        self.rollbacks = rollbacks
+        self.end = end
+        self.game_start = game_start
+        self.game_end = game_end
+        self.metadata_raw = metadata_raw
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def metadata(self) -> Optional[Metadata]:
+        """The replay's metadata, if any"""
+        return Metadata._parse(self.metadata_raw) if self.metadata_raw is not None else None
+
+    def _attr_repr(self, attr):
+        if attr in ('payload_sizes', 'metadata_raw'):
+            return None
+        elif attr in ('offsets', 'rollbacks'):
+            return '%s=[...](%d)' % (attr, len(getattr(self, attr)))
+        else:
+            return super()._attr_repr(attr)
+
+    def _range(self, start, stop):
+        """Byte range holding the final copies of frames `start` to `stop` (exclusive)."""
+        return (self.offsets[start], self.offsets[stop] if stop < len(self.offsets) else self.end)
+
+    @classmethod
+    def _scan(cls, reader, payload_sizes, total_size):
+        base = reader.tell()
+        if base is None:
+            raise ValueError('frame index requires seekable input')
+        # one read, then walk the events by offset: only frame numbers get decoded
+        data = reader.read(total_size) if total_size else reader.rest()
+
+        frame_codes = {t.value for t in _FRAME_EVENT_TYPES}
+        game_end = EventType.GAME_END.value
+        unpack_frame = struct.Struct('>i').unpack_from
+
+        # Replays are limited to 4 GiB by the 32-bit `raw` length, so offsets fit in 32 bits.
+        offsets = array.array('I')
+        rollbacks = array.array('H')
+        game_start = None
+        game_end = None
+        last = None
+        pos = 0
+        while pos < len(data):
+            code = data[pos]
+            try: size = payload_sizes[code]
+            except KeyError: raise ValueError('unexpected event type: 0x%02x' % code)
+            if pos + 1 + size > len(data): # in-progress replay, ends mid-event
+                break
+
+            if code in frame_codes:
+                (frame,) = unpack_frame(data, pos + 1)
+                if frame != last:
+                    last = frame
+                    i = frame - FIRST_FRAME_INDEX
+                    if i == len(offsets):
+                        offsets.append(base + pos)
+                        rollbacks.append(0)
+                    elif 0 <= i < len(offsets):
+                        offsets[i] = base + pos
+                        rollbacks[i] += 1
+                    else:
+                        raise ValueError(f'missing frames: {len(offsets)-1} -> {i}')
+            elif code == EventType.GAME_START.value:
+                game_start = base + pos
+            elif code == EventType.GAME_END.value:
+                game_end = base + pos
+                break
+
+            pos += 1 + size
+
+        return cls(payload_sizes, offsets, rollbacks, base + pos, game_start, game_end)
+
+    # Sidecar file format: everything little-endian. Header, then the payload sizes table, then the two per-frame arrays, then the metadata as JSON.
+    _MAGIC = b'SLPIDX\x01'
+    _HEADER = struct.Struct('<7sQqqqIHI')
+    _PAYLOAD_SIZE = struct.Struct('<BH')
+
+    def _save(self, path, size, mtime):
+        """Write this index to `path` (atomically), tagged with the replay's size and mtime."""
+
+        import json, tempfile
+
+        def arr(a):
+            if sys.byteorder == 'big':
+                a = array.array(a.typecode, a)
+                a.byteswap()
+            return a.tobytes()
+
+        # high-precision numbers (UBJSON `H`) are decoded as `Decimal`s, which JSON can't represent: keep them as strings
+        metadata = b'' if self.metadata_raw is None else json.dumps(self.metadata_raw, default=str).encode('utf-8')
+        parts = [self._HEADER.pack(self._MAGIC, size, mtime,
+            -1 if self.game_start is None else self.game_start,
+            -1 if self.game_end is None else self.game_end,
+            self.end, len(self.payload_sizes), len(self.offsets))]
+        parts.extend(self._PAYLOAD_SIZE.pack(code, s) for (code, s) in sorted(self.payload_sizes.items()))
+        parts.extend((arr(self.offsets), arr(self.rollbacks), metadata))
+
+        (fd, tmp) = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(b''.join(parts))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def _load(cls, path, size, mtime):
+        """Read an index from `path`. Returns None if it doesn't exist, is damaged, or doesn't match the replay's size & mtime."""
+
+        import json
+
+        def arr(typecode, count):
+            nonlocal pos
+            a = array.array(typecode)
+            end = pos + a.itemsize * count
+            a.frombytes(data[pos:end])
+            if sys.byteorder == 'big':
+                a.byteswap()
+            pos = end
+            return a
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            (magic, idx_size, idx_mtime, game_start, game_end, end, payload_count, frame_count) = cls._HEADER.unpack_from(data)
+            if magic != cls._MAGIC or idx_size != size or idx_mtime != mtime:
+                return None
+            pos = cls._HEADER.size
+            payload_sizes = {}
+            for _ in range(payload_count):
+                (code, s) = cls._PAYLOAD_SIZE.unpack_from(data, pos)
+                payload_sizes[code] = s
+                pos += cls._PAYLOAD_SIZE.size
+            offsets = arr('I', frame_count)
+            rollbacks = arr('H', frame_count)
+            if len(rollbacks) != frame_count:
+                return None
+            metadata_raw = json.loads(data[pos:].decode('utf-8')) if pos < len(data) else None
+        except (OSError, ValueError, struct.error):
+            return None
+
+        return cls(payload_sizes, offsets, rollbacks, end,
+            None if game_start < 0 else game_start,
+            None if game_end < 0 else game_end,
+            metadata_raw)
+
+
+def _build_index(reader):
+    (payload_sizes, total_size) = _parse_header(reader)
+    index = FrameIndex._scan(reader, payload_sizes, total_size)
+    if total_size: # metadata follows the events, and only once the game is over
+        _parse_metadata(reader, {ParseEvent.METADATA_RAW: lambda x: setattr(index, 'metadata_raw', x)})
+    return index
+
+
+def build_index(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike]) -> FrameIndex:
+    """Scan a replay for the position of every frame, without decoding any frame data.
+
+    :param input: replay file object, path, or in-memory replay data. File objects must be seekable."""
+
+    with _open(input) as reader:
+        return _build_index(reader)
+
+
+def index_path(path: Union[str, os.PathLike], index_dir: Union[str, os.PathLike, None] = None) -> str:
+    """Where the sidecar index file for a replay goes: next to it (`game.slp.idx`), or in `index_dir` if given. Files in a shared index directory are named after both the replay and a hash of its full path, so replays with the same name don't collide.
+
+    :param path: replay path
+    :param index_dir: shared directory for index files"""
+
+    path = os.fspath(path)
+    if index_dir is None:
+        return path + '.idx'
+    import hashlib
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return os.path.join(os.fspath(index_dir), '%s.%s.idx' % (os.path.basename(path), digest))
+
+
+def open_index(path: Union[str, os.PathLike], index_dir: Union[str, os.PathLike, None] = None, write: bool = True) -> FrameIndex:
+    """Get a replay's index from its sidecar file (see :py:func:`index_path`), building it if the sidecar is missing or out of date.
+
+    A sidecar is only used if the replay's size and modification time match those recorded in it, so a replay that's still being written (or has been replaced) is re-scanned. With an up-to-date sidecar, neither metadata (:py:attr:`FrameIndex.metadata`) nor frame positions require reading the replay at all.
+
+    :param path: replay path
+    :param index_dir: shared directory for index files (default: next to each replay)
+    :param write: when true, save a newly built index as a sidecar file (if the sidecar can't be written, the index is still returned)"""
+
+    sidecar = index_path(path, index_dir)
+    st = os.stat(path)
+    index = FrameIndex._load(sidecar, st.st_size, st.st_mtime_ns)
+    if index is None:
+        with _open(path) as reader:
+            index = _build_index(reader)
+        if write:
+            # the sidecar only saves time later, so failing to write one (e.g. to read-only media) isn't an error
+            try:
+                if index_dir is not None:
+                    os.makedirs(index_dir, exist_ok=True)
+                index._save(sidecar, st.st_size, st.st_mtime_ns)
+            except OSError as e:
+                log.info('not saving index: %s' % e)
+    return index
+
+
+def read_frames(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], start: Optional[int] = None, stop: Optional[int] = None, index: Optional[FrameIndex] = None, ports: Optional[Iterable[int]] = None, data: Iterable[str] = _ALL_DATA) -> List[Frame]:
+    """Parse a range of frames, seeking straight to the first one. `start` and `stop` are indexes into :py:attr:`slippi.game.Game.frames`, with the same meaning as in a slice (e.g. `read_frames(path, -60)` reads the last 60 frames).
+
+    :param input: replay file object, path, or in-memory replay data. File objects must be seekable.
+    :param index: index of `input`, from :py:func:`build_index` or :py:func:`open_index`. If None, one is built first; reuse it when reading several ranges from the same replay.
+    :param ports: if not None, only decode frame data for these ports (see :py:func:`slippi.parse.parse`)
+    :param data: which kinds of per-character frame data to decode (see :py:func:`slippi.parse.parse`)"""
+
+    (ports, data) = _selection(ports, data)
+    with _open(input) as reader:
+        if index is None:
+            (payload_sizes, total_size) = _parse_header(reader)
+            index = FrameIndex._scan(reader, payload_sizes, total_size)
+
+        (start, stop, _) = slice(start, stop).indices(len(index))
+        if start >= stop:
+            return []
+
+        (begin, end) = index._range(start, stop)
+        reader.seek(begin)
+        frames: Dict[int, Frame] = {}
+        for (_, frame) in _parse_events(reader, index.payload_sizes, end - begin, False, frozenset([ParseEvent.FRAME]), ports, data):
+            # the range can include stale copies of frames just after it, and earlier copies of frames in it
+            i = frame.index - FIRST_FRAME_INDEX
+            if start <= i < stop:
+                frames[i] = frame
+        return [frames[i] for i in range(start, stop)]
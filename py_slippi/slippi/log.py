@@ -1,6 +1,6 @@
-import logging, os
+"""Logging, through the `slippi` logger. Importing this library doesn't configure logging, and neither imports nor touches the `logging` module until something is first logged. Set the `LOG_LEVEL` environment variable (e.g. `LOG_LEVEL=debug`) to have the `slippi` logger print its messages, colored by level."""
 
-from termcolor import colored
+import functools, os
 
 
 COLORS = {
@@ -11,16 +11,37 @@ COLORS = {
     'ERROR': 'red'}
 
 
-_old_factory = logging.getLogRecordFactory()
-def record_factory(*args, **kwargs):
-    record = _old_factory(*args, **kwargs)
-    l = record.levelname
-    record.levelname_colored = colored(l, COLORS.get(l, 'white'))
-    return record
+@functools.lru_cache(maxsize=None) # configured once, however many attributes are looked up
+def _logger():
+    import logging
 
+    logger = logging.getLogger('slippi')
+    level = os.environ.get('LOG_LEVEL')
+    if level:
+        from termcolor import colored
 
-logging.setLogRecordFactory(record_factory)
-logging.basicConfig(
-    level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
-    format="%(levelname_colored)s: %(message)s")
-log = logging.getLogger()
+        class ColoredFormatter(logging.Formatter):
+            def formatMessage(self, record):
+                l = record.levelname
+                return '%s: %s' % (colored(l, COLORS.get(l, 'white')), record.message)
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(ColoredFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(level.upper())
+        logger.propagate = False
+    return logger
+
+
+class _Log:
+    """Stands in for the `slippi` logger, which it creates on first use."""
+
+    def __getattr__(self, name):
+        # after this, lookups find the logger's (bound) attributes directly
+        logger = _logger()
+        for attr in ('debug', 'info', 'warning', 'error', 'critical', 'exception', 'log', 'isEnabledFor'):
+            setattr(self, attr, getattr(logger, attr))
+        return getattr(logger, name)
+
+
+log = _Log()
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import io, os, pathlib, re
-from typing import BinaryIO, Callable, Dict, Union
+import collections, contextlib, mmap, os, re, time
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-import ubjson
-
-from .event import End, EventType, Frame, Start
+from . import id as sid
+from .event import _CHARACTERS, End, EventType, Frame, Start, _action_states, _items
 from .log import log
 from .metadata import Metadata
 from .util import *
@@ -31,10 +30,248 @@ class ParseError(IOError):
         self.pos = pos
 
     def __str__(self):
+        # not `super().__str__()`: once `filename` is set, OSError formats
+        # itself as "[Errno None] None: <filename>", dropping the message
         return 'Parse error (%s %s): %s' % (
             self.filename or '?',
             '@0x%x' % self.pos if self.pos else '?',
-            super().__str__())
+            self.args[0] if self.args else '')
+
+    def __reduce__(self):
+        # OSError's own pickling mangles the constructor arguments
+        return (self.__class__, (self.args[0] if self.args else None, self.filename, self.pos))
+
+
+class ParseStats(Base):
+    """Statistics about parsing, gathered only when requested (see the `stats` parameter of :py:func:`parse` and :py:class:`slippi.game.Game`). Stats for many replays can be added together, e.g. `sum(stats, ParseStats())`."""
+
+    __slots__ = 'files', 'bytes_read', 'events', 'rollbacks', 'unknown_values', 'times', '_clock'
+
+    files: int #: Number of replays parsed
+    bytes_read: int #: Bytes of replay data parsed or skipped over
+    events: collections.Counter #: Number of events of each :py:class:`slippi.event.EventType` (raw codes for unknown types)
+    rollbacks: int #: Number of frames replaced by a later copy, due to rollback (counted by :py:class:`slippi.game.Game`)
+    unknown_values: collections.Counter #: Number of decoded values missing from their enum, by `(enum name, value)`. Frame data is checked for action states, characters and item types.
+    times: Dict[str, float] #: Wall time spent in each phase of parsing, in seconds: `header` (including the event payloads table), `events` and `metadata`
+
+    def __init__(self):
+        self.files = 0
+        self.bytes_read = 0
+        self.events = collections.Counter()
+        self.rollbacks = 0
+        self.unknown_values = collections.Counter()
+        self.times = {'header': 0.0, 'events': 0.0, 'metadata': 0.0}
+        self._clock = 0.0
+
+    def __iadd__(self, other):
+        self.files += other.files
+        self.bytes_read += other.bytes_read
+        self.events.update(other.events)
+        self.rollbacks += other.rollbacks
+        self.unknown_values.update(other.unknown_values)
+        for (phase, t) in other.times.items():
+            self.times[phase] = self.times.get(phase, 0.0) + t
+        return self
+
+    def __add__(self, other):
+        if not isinstance(other, ParseStats):
+            return NotImplemented
+        stats = ParseStats()
+        stats += self
+        stats += other
+        return stats
+
+    def _lap(self, phase):
+        """Charge the time since the previous lap to `phase`."""
+        now = time.perf_counter()
+        if phase is not None:
+            self.times[phase] += now - self._clock
+        self._clock = now
+
+
+class _StreamReader:
+    """Reads a replay from a file-like object, in large blocks. Reads are served from the current block, so decoding a replay's many small fields doesn't cost a `stream.read` (or a system call, for unbuffered streams) each. Every read returns a fresh `bytes`.
+
+    Streams that can't seek (pipes, sockets, HTTP responses, ...) are still fully supported: skipping over data reads and discards it a block at a time.
+
+    Blocks start small and double up to `block_size`, so reading just a replay's header (e.g. before seeking to its metadata) doesn't pull in a full block of frame data."""
+
+    __slots__ = 'stream', 'name', 'seekable', 'block_size', 'next_block', 'buf', 'pos', 'base'
+
+    def __init__(self, stream: BinaryIO, name: Optional[str] = None, block_size: int = 256 * 1024):
+        self.stream = stream
+        self.name = name
+        # not all stream-like objects support `seekable` (e.g. HTTP requests)
+        try: self.seekable = stream.seekable()
+        except AttributeError: self.seekable = False
+        self.block_size = block_size
+        self.next_block = min(4096, block_size)
+        self.buf = b''
+        self.pos = 0 # read position within `buf`
+        self.base = stream.tell() if self.seekable else 0 # stream position of `buf[0]`
+
+    def _read_block(self, size):
+        return self.stream.read(size)
+
+    def _fill(self, size):
+        """Make sure at least `size` unread bytes are buffered. Returns False if the stream ends first."""
+        chunks = [self.buf[self.pos:]] if self.pos < len(self.buf) else []
+        have = len(self.buf) - self.pos
+        while have < size:
+            # streams can return less than requested (e.g. pipes), so keep going until they're exhausted
+            data = self._read_block(max(self.next_block, size - have))
+            if not data:
+                break
+            self.next_block = min(2 * self.next_block, self.block_size)
+            chunks.append(data)
+            have += len(data)
+        self.base += self.pos
+        self.buf = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+        self.pos = 0
+        return have >= size
+
+    def byte(self):
+        pos = self.pos
+        if pos >= len(self.buf):
+            if not self._fill(1):
+                raise EOFError()
+            pos = 0
+        self.pos = pos + 1
+        return self.buf[pos]
+
+    def read(self, size):
+        pos = self.pos
+        end = pos + size
+        if end > len(self.buf):
+            if not self._fill(size):
+                raise EOFError()
+            (pos, end) = (0, size)
+        self.pos = end
+        return self.buf[pos:end]
+
+    def skip(self, size):
+        remaining = size - (len(self.buf) - self.pos)
+        if remaining <= 0:
+            self.pos += size
+            return
+
+        self.base += len(self.buf)
+        self.buf = b''
+        self.pos = 0
+        if self.seekable:
+            self.stream.seek(remaining, os.SEEK_CUR)
+            self.base += remaining
+        else:
+            while remaining > 0:
+                data = self._read_block(min(self.block_size, remaining))
+                if not data:
+                    raise EOFError()
+                remaining -= len(data)
+                self.base += len(data)
+            if remaining < 0: # the last block overshot; keep what's past the skipped range
+                self.buf = data[remaining:]
+                self.base += remaining
+
+    def seek(self, pos):
+        if self.base <= pos <= self.base + len(self.buf):
+            self.pos = pos - self.base
+        else:
+            self.stream.seek(pos)
+            self.base = pos
+            self.buf = b''
+            self.pos = 0
+
+    def peek(self, size):
+        """Read ahead without consuming anything."""
+        pos = self.pos
+        if pos + size > len(self.buf):
+            if not self._fill(size):
+                raise EOFError()
+            pos = 0
+        return self.buf[pos:pos + size]
+
+    def rest(self):
+        data = self.buf[self.pos:] + self.stream.read()
+        self.base += self.pos + len(data)
+        self.buf = b''
+        self.pos = 0
+        return data
+
+    def tell(self):
+        return self.base + self.pos if self.seekable else None
+
+    def offset(self):
+        """Position relative to some fixed point, even for streams that can't tell their position. Only good for measuring distances."""
+        return self.base + self.pos
+
+
+class _BufferReader:
+    """Reads a replay that's already in memory (or memory-mapped), by walking an integer offset. Every read returns a `memoryview` slice of the underlying buffer, so event payloads are never copied."""
+
+    __slots__ = 'buf', 'pos', 'name'
+
+    def __init__(self, buf, name: Optional[str] = None):
+        self.buf = memoryview(buf)
+        self.pos = 0
+        self.name = name
+
+    def byte(self):
+        pos = self.pos
+        if pos >= len(self.buf):
+            raise EOFError()
+        self.pos = pos + 1
+        return self.buf[pos]
+
+    def read(self, size):
+        pos = self.pos
+        end = pos + size
+        if end > len(self.buf):
+            raise EOFError()
+        self.pos = end
+        return self.buf[pos:end]
+
+    def skip(self, size):
+        self.pos += size
+
+    def seek(self, pos):
+        self.pos = pos
+
+    def peek(self, size):
+        pos = self.pos
+        if pos + size > len(self.buf):
+            raise EOFError()
+        return self.buf[pos:pos + size]
+
+    def rest(self):
+        data = self.buf[self.pos:]
+        self.pos = len(self.buf)
+        return data
+
+    def tell(self):
+        return self.pos
+
+    offset = tell
+
+
+class _FollowReader(_StreamReader):
+    """Reads a replay that's still being written. Whenever a read catches up with the writer, waits for more data instead of failing, so parsing picks up mid-event where it left off."""
+
+    __slots__ = 'poll_interval', 'timeout'
+
+    def __init__(self, stream: BinaryIO, name: Optional[str], poll_interval: float, timeout: Optional[float]):
+        super().__init__(stream, name)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def _read_block(self, size):
+        data = self.stream.read(size)
+        last_data = time.monotonic()
+        while not data:
+            if self.timeout is not None and time.monotonic() - last_data > self.timeout:
+                raise TimeoutError(f'no new data for {self.timeout}s')
+            time.sleep(self.poll_interval)
+            data = self.stream.read(size)
+        return data
 
 
 def _parse_event_payloads(stream):
@@ -56,101 +293,186 @@ def _parse_event_payloads(stream):
         try: EventType(code)
         except ValueError: log.info('ignoring unknown event type: 0x%02x' % code)
 
-    log.debug(f'event payload sizes: {sizes}')
+    log.debug('event payload sizes: %s', sizes)
     return (2 + this_size, sizes)
 
 
-def _parse_event(event_stream, payload_sizes):
-    (code,) = unpack('B', event_stream)
-    log.debug(f'Event: 0x{code:x}')
-
-    # remember starting pos for better error reporting
-    try: base_pos = event_stream.tell() if event_stream.seekable() else None
-    except AttributeError: base_pos = None
-
-    try: size = payload_sizes[code]
-    except KeyError: raise ValueError('unexpected event type: 0x%02x' % code)
-
-    stream = io.BytesIO(event_stream.read(size))
-
+# Decoder for each event type, given its payload. Frame events are only
+# wrapped with their frame & port: their payloads are decoded once the whole
+# frame has been read (or, for pre- and post-frame data, when accessed).
+# Every decoder picks its payload layout by size (see `Layout`), so optional
+# fields added by later Slippi versions never need exception handling.
+_DECODERS = {
+    EventType.GAME_START.value: Start._parse,
+    EventType.FRAME_PRE.value: lambda payload: Frame.Event(Frame.Event.PortId(payload), Frame.Event.Type.PRE, payload),
+    EventType.FRAME_POST.value: lambda payload: Frame.Event(Frame.Event.PortId(payload), Frame.Event.Type.POST, payload),
+    EventType.FRAME_START.value: lambda payload: Frame.Event(Frame.Event.Id(payload), Frame.Event.Type.START, payload),
+    EventType.ITEM.value: lambda payload: Frame.Event(Frame.Event.Id(payload), Frame.Event.Type.ITEM, payload),
+    EventType.FRAME_END.value: lambda payload: Frame.Event(Frame.Event.Id(payload), Frame.Event.Type.END, payload),
+    EventType.GAME_END.value: End._parse}
+
+
+def _enum_fields():
+    """Enum fields of frame events, as `(offset, struct code, lookup table, enum)`. Checked for values missing from their enums when gathering stats, straight from payloads (as frame data isn't otherwise decoded until it's accessed)."""
+    return {
+        EventType.FRAME_PRE.value: ((10, 'H', _action_states(), sid.ActionState),),
+        EventType.FRAME_POST.value: ((6, 'B', _CHARACTERS, sid.InGameCharacter), (7, 'H', _action_states(), sid.ActionState)),
+        EventType.ITEM.value: ((4, 'H', _items(), sid.Item),)}
+
+
+def _checking_enums(decoder, fields, unknown_values):
+    """Wrap an event decoder to count unknown enum values in its payloads."""
+
+    fields = [(struct.Struct('>' + code), offset, table, enum.__name__) for (offset, code, table, enum) in fields]
+    def decode(payload):
+        for (s, offset, table, name) in fields:
+            (value,) = s.unpack_from(payload, offset)
+            # tables hold the raw value where there's no enum member
+            if value >= len(table) or type(table[value]) is int:
+                unknown_values[(name, value)] += 1
+        return decoder(payload)
+    return decode
+
+
+def _parse_event(reader, decoder, size):
+    payload = reader.read(size)
     try:
-        try: event_type = EventType(code)
-        except ValueError: event_type = None
-
-        if event_type is EventType.GAME_START:
-            event = Start._parse(stream)
-        elif event_type is EventType.FRAME_PRE:
-            event = Frame.Event(Frame.Event.PortId(stream),
-                                Frame.Event.Type.PRE,
-                                stream)
-        elif event_type is EventType.FRAME_POST:
-            event = Frame.Event(Frame.Event.PortId(stream),
-                                Frame.Event.Type.POST,
-                                stream)
-        elif event_type is EventType.FRAME_START:
-            event = Frame.Event(Frame.Event.Id(stream),
-                                Frame.Event.Type.START,
-                                stream)
-        elif event_type is EventType.ITEM:
-            event = Frame.Event(Frame.Event.Id(stream),
-                                Frame.Event.Type.ITEM,
-                                stream)
-        elif event_type is EventType.FRAME_END:
-            event = Frame.Event(Frame.Event.Id(stream),
-                                Frame.Event.Type.END,
-                                stream)
-        elif event_type is EventType.GAME_END:
-            event = End._parse(stream)
-        else:
-            event = None
-        return (1 + size, event)
+        return decoder(payload)
     except Exception as e:
-        # Calculate the stream position of the exception as best we can.
-        # This won't be perfect: for an invalid enum, the calculated position
-        # will be *after* the value at minimum, and may be farther than that
-        # due to `unpack`ing multiple values at once. But it's better than
-        # leaving it up to the `catch` clause in `parse`, because that will
-        # always report a position that's at the end of an event (due to
-        # `event_stream.read` above).
-        raise ParseError(str(e), pos = base_pos + stream.tell() if base_pos else None)
-
+        # Payloads are decoded in one go, so the best we can do is point at
+        # the start of the event's payload. That's still better than leaving
+        # it up to `_wrap_error`, which would report the end of the event.
+        end_pos = reader.tell()
+        raise ParseError(str(e), pos = end_pos - size if end_pos else None)
+
+
+_EVENT_CODES = frozenset(t.value for t in EventType)
+
+
+# Event types that have to be decoded to produce each parse event. Events
+# that aren't needed for any requested parse event are skipped undecoded.
+_EVENT_TYPES = {
+    ParseEvent.START: {EventType.GAME_START},
+    ParseEvent.FRAME: {EventType.FRAME_PRE, EventType.FRAME_POST, EventType.FRAME_START, EventType.ITEM, EventType.FRAME_END},
+    ParseEvent.END: {EventType.GAME_END},
+    ParseEvent.FRAME_START: {EventType.FRAME_START},
+    ParseEvent.ITEM: {EventType.ITEM},
+    ParseEvent.FRAME_END: {EventType.FRAME_END}}
+
+_FRAME_EVENT_TYPES = _EVENT_TYPES[ParseEvent.FRAME]
+
+# Event types that start with a `Frame.Event.PortId` header.
+_PORT_EVENT_TYPES = {EventType.FRAME_PRE, EventType.FRAME_POST}
+
+_DEFAULT_INCLUDE = frozenset([ParseEvent.START, ParseEvent.FRAME, ParseEvent.END, ParseEvent.METADATA, ParseEvent.METADATA_RAW])
+
+# Per-character frame data, by the name used to select it.
+_DATA_EVENT_TYPES = {
+    'pre': EventType.FRAME_PRE,
+    'post': EventType.FRAME_POST}
+
+_ALL_DATA = frozenset(_DATA_EVENT_TYPES)
+
+
+def _selection(ports, data):
+    """Validate & normalize the `ports` and `data` arguments of the public parse functions."""
+
+    ports = None if ports is None else frozenset(ports)
+    data = frozenset(data)
+    for p in ports or ():
+        if not 0 <= p < 4:
+            raise ValueError('invalid port: %r' % p)
+    for d in data:
+        if d not in _DATA_EVENT_TYPES:
+            raise ValueError('invalid frame data: %r (expected %s)' % (d, ' or '.join(repr(k) for k in _DATA_EVENT_TYPES)))
+    return (ports, data)
+
+
+def _parse_events(reader, payload_sizes, total_size, skip_frames, include = _DEFAULT_INCLUDE, ports = None, data = _ALL_DATA, stats = None):
+    """Parse the replay's events, yielding `(ParseEvent, value)` pairs as each one completes. Only the parse events in `include` are produced, and events that none of them need are skipped without being decoded. Likewise for pre-/post-frame events, unless they're for one of `ports` (all if None) and their kind is in `data`.
+
+    If `stats` is given, events are counted into it by raw event code, and decoded frame events are checked for unknown enum values."""
+
+    decode = set()
+    for e in include:
+        decode.update(_EVENT_TYPES.get(e, ()))
+    if skip_frames:
+        decode -= _FRAME_EVENT_TYPES
+    for (d, t) in _DATA_EVENT_TYPES.items():
+        if d not in data:
+            decode.discard(t)
+    check_port = ports is not None and bool(decode & _PORT_EVENT_TYPES)
+    # if we don't need anything from the frames, we can jump straight over them
+    skip_frames = not decode & _FRAME_EVENT_TYPES
+
+    # chosen once, and shared by every event of the replay
+    decoders = {t.value: _DECODERS[t.value] for t in decode}
+    counts = None
+    if stats is not None:
+        counts = stats.events
+        for (code, fields) in _enum_fields().items():
+            if code in decoders:
+                decoders[code] = _checking_enums(decoders[code], fields, stats.unknown_values)
+
+    frames = ParseEvent.FRAME in include and not skip_frames
+    frame_starts = ParseEvent.FRAME_START in include
+    items = ParseEvent.ITEM in include
+    frame_ends = ParseEvent.FRAME_END in include
 
-def _parse_events(stream, payload_sizes, total_size, handlers, skip_frames):
     current_frame = None
     bytes_read = 0
-    event = None
 
     # `total_size` will be zero for in-progress replays
-    while (total_size == 0 or bytes_read < total_size) and event != ParseEvent.END:
-        (b, event) = _parse_event(stream, payload_sizes)
-        bytes_read += b
-        if isinstance(event, Start):
-            handler = handlers.get(ParseEvent.START)
-            if handler:
-                handler(event)
-            if skip_frames: 
+    while total_size == 0 or bytes_read < total_size:
+        code = reader.byte()
+        if counts is not None:
+            counts[code] += 1
+
+        try: size = payload_sizes[code]
+        except KeyError: raise ValueError('unexpected event type: 0x%02x' % code)
+        bytes_read += 1 + size
+
+        decoder = decoders.get(code)
+        wanted = decoder is not None
+        if wanted and check_port and code in _PORT_EVENT_TYPES:
+            # port number is the fifth byte, after the frame index
+            wanted = reader.peek(5)[4] in ports
+
+        if wanted:
+            event = _parse_event(reader, decoder, size)
+        else:
+            reader.skip(size)
+            event = None
+
+        if code == EventType.GAME_START:
+            if event:
+                yield (ParseEvent.START, event)
+            if skip_frames and total_size:
                 skip = total_size - bytes_read - payload_sizes[EventType.GAME_END.value] - 1
-                stream.seek(skip, os.SEEK_CUR)
+                reader.skip(skip)
                 bytes_read += skip
-                continue
-        elif isinstance(event, End):
-            handler = handlers.get(ParseEvent.END)
-            if handler:
-                handler(event)
-        elif isinstance(event, Frame.Event):
-            # Accumulate all events for a single frame into a single `Frame` object.
-
-            # We can't use Frame Bookend events to detect end-of-frame,
-            # as they don't exist before Slippi 3.0.0.
-            if current_frame and current_frame.index != event.id.frame:
+        elif code == EventType.GAME_END:
+            # the last frame is complete once the game has ended
+            if current_frame:
                 current_frame._finalize()
-                handler = handlers.get(ParseEvent.FRAME)
-                if handler:
-                    handler(current_frame)
+                yield (ParseEvent.FRAME, current_frame)
                 current_frame = None
-
-            if not current_frame:
-                current_frame = Frame(event.id.frame)
+            if event:
+                yield (ParseEvent.END, event)
+            break
+        elif event:
+            if frames:
+                # Accumulate all events for a single frame into a single `Frame` object.
+
+                # We can't rely on Frame Bookend events to detect end-of-frame,
+                # as they don't exist before Slippi 3.0.0.
+                if current_frame and current_frame.index != event.id.frame:
+                    current_frame._finalize()
+                    yield (ParseEvent.FRAME, current_frame)
+                    current_frame = None
+
+                if not current_frame:
+                    current_frame = Frame(event.id.frame)
 
             if event.type is Frame.Event.Type.PRE or event.type is Frame.Event.Type.POST:
                 port = current_frame.ports[event.id.port]
@@ -169,97 +491,366 @@ def _parse_events(stream, payload_sizes, total_size, handlers, skip_frames):
                     data._pre = event.data
                 else:
                     data._post = event.data
+            # Frames keep raw payloads, decoded on first access (like pre- & post-frame data).
+            # Events that are also produced on their own have to be decoded now, and then
+            # the frame shares the decoded object.
             elif event.type is Frame.Event.Type.ITEM:
-                current_frame.items.append(Frame.Item._parse(event.data))
+                item = event.data
+                if items:
+                    item = Frame.Item._parse(item)
+                    yield (ParseEvent.ITEM, item)
+                if frames:
+                    current_frame._items.append(item)
             elif event.type is Frame.Event.Type.START:
-                current_frame.start = Frame.Start._parse(event.data)
+                frame_start = event.data
+                if frame_starts:
+                    frame_start = Frame.Start._parse(frame_start)
+                    yield (ParseEvent.FRAME_START, frame_start)
+                if frames:
+                    current_frame._start = frame_start
             elif event.type is Frame.Event.Type.END:
-                current_frame.end = Frame.End._parse(event.data)
+                frame_end = event.data
+                if frame_ends:
+                    frame_end = Frame.End._parse(frame_end)
+                    yield (ParseEvent.FRAME_END, frame_end)
+                if frames:
+                    # `added(3.0.0)` the frame is complete, no need to wait for the next one
+                    current_frame._end = frame_end
+                    current_frame._finalize()
+                    yield (ParseEvent.FRAME, current_frame)
+                    current_frame = None
             else:
                 raise Exception('unknown frame data type: %s' % event.data)
 
     if current_frame:
         current_frame._finalize()
-        handler = handlers.get(ParseEvent.FRAME)
-        if handler:
-            handler(current_frame)
+        yield (ParseEvent.FRAME, current_frame)
 
 
-def _parse(stream, handlers, skip_frames):
+def _parse_header(reader):
+    """Parse everything up to the first event after the event payloads table. Returns the payload sizes and the number of bytes of events that follow (zero for in-progress replays)."""
+
     # For efficiency, don't send the whole file through ubjson.
     # Instead, assume `raw` is the first element. This is brittle and
     # ugly, but it's what the official parser does so it should be OK.
-    expect_bytes(b'{U\x03raw[$U#l', stream)
-    (length,) = unpack('l', stream)
-
-    (bytes_read, payload_sizes) = _parse_event_payloads(stream)
-    _parse_events(stream, payload_sizes, length - bytes_read, handlers, skip_frames)
-
-    expect_bytes(b'U\x08metadata', stream)
-
-    # It's possible for Wiis to have nicknames containing invalid utf-8 characters,
-    # which prevents ubjson from loading the blob. This hack replaces the Wii's ConsoleNick
-    # field with Wiiii...i (matching the length of the original nickname), to prevent this.
-    # (How Sp0t managed to get his wii into this cursed state is still unknown~).
-    orig_bytes = b''.join(stream.readlines())
-    if b"consoleNickSU" in orig_bytes and b"players{" in orig_bytes:
-        start = orig_bytes.index(b"consoleNickSU") + len(b"consoleNickSU") + 1
-        end = orig_bytes.index(b"players{") - 2
-        new_console_nick = b"W" + b'i' * (end - start - 1) if end > start else b""
-        new_bytes = orig_bytes[:start] + new_console_nick + orig_bytes[end:]
-        stream = io.BytesIO(new_bytes)
+    expect_bytes(b'{U\x03raw[$U#l', reader)
+    (length,) = unpack('l', reader)
+
+    (bytes_read, payload_sizes) = _parse_event_payloads(reader)
+    return (payload_sizes, length - bytes_read if length else 0)
+
+
+# UBJSON number types, by marker. Used for values, and for string & container lengths and counts.
+_UBJSON_NUMBERS = {ord(m): struct.Struct('>' + f) for (m, f) in (('i', 'b'), ('U', 'B'), ('I', 'h'), ('l', 'i'), ('L', 'q'), ('d', 'f'), ('D', 'd'))}
+_UBJSON_CONSTANTS = {ord('Z'): None, ord('T'): True, ord('F'): False}
+
+
+def _ubjson_number(buf, pos, marker):
+    if marker == 0x55: # U, by far the most common (e.g. every key length)
+        return (buf[pos], pos + 1)
+    try: s = _UBJSON_NUMBERS[marker]
+    except KeyError: raise ValueError('invalid UBJSON number type: 0x%02x' % marker)
+    return (s.unpack_from(buf, pos)[0], pos + s.size)
+
+
+def _ubjson_value(buf, pos, marker, skip = frozenset(), keep = True):
+    """Decode one UBJSON value from `buf`, starting just after its type marker. Returns the value and the position after it.
+
+    Object entries whose keys are in `skip` are passed over without building anything, at any depth. If `keep` is false, the whole value is passed over: strings and containers then come back as None.
+
+    Slippi's metadata is written by consoles and Dolphin alike, and not always as valid UTF-8 (e.g. console nicknames), so strings are decoded with replacement characters rather than failing."""
+
+    while marker == 0x4e: # N(o-op)
+        marker = buf[pos]
+        pos += 1
+
+    if marker == 0x53 or marker == 0x48: # S(tring), H(igh-precision number, as a string)
+        (size, pos) = _ubjson_number(buf, pos + 1, buf[pos])
+        end = pos + size
+        if end > len(buf):
+            raise EOFError()
+        if not keep:
+            return (None, end)
+        value = str(buf[pos:end], 'utf-8', 'replace')
+        if marker == 0x48:
+            import decimal # rare, so not imported up front
+            return (decimal.Decimal(value), end)
+        return (value, end)
+    elif marker == 0x7b or marker == 0x5b: # {, [
+        return _ubjson_container(buf, pos, marker == 0x7b, skip, keep)
+    elif marker == 0x43: # C(har)
+        return (chr(buf[pos]), pos + 1)
+    elif marker in _UBJSON_CONSTANTS:
+        return (_UBJSON_CONSTANTS[marker], pos)
     else:
-        stream = io.BytesIO(orig_bytes)
+        return _ubjson_number(buf, pos, marker)
+
+
+def _ubjson_container(buf, pos, is_object, skip, keep):
+    value_marker = None # shared type of all values, if given
+    count = -1 # number of values, if given (otherwise, read until the end marker)
+    if buf[pos] == 0x24: # $
+        value_marker = buf[pos + 1]
+        if buf[pos + 2] != 0x23:
+            raise ValueError('UBJSON container type without count')
+        pos += 2
+    if buf[pos] == 0x23: # #
+        (count, pos) = _ubjson_number(buf, pos + 2, buf[pos + 1])
+
+    end = 0x7d if is_object else 0x5d # }, ]
+    result = ({} if is_object else []) if keep else None
+    while count:
+        if is_object or value_marker is None:
+            marker = buf[pos]
+            pos += 1
+            if count < 0:
+                if marker == end:
+                    break
+                elif marker == 0x4e: # N(o-op)
+                    continue
+        if count > 0:
+            count -= 1
+
+        if is_object:
+            # keys are strings, without the `S` marker
+            (size, pos) = _ubjson_number(buf, pos, marker)
+            key = str(buf[pos:pos + size], 'utf-8', 'replace')
+            pos += size
+            keep_value = keep and key not in skip
+            if value_marker is None:
+                marker = buf[pos]
+                pos += 1
+            else:
+                marker = value_marker
+            (value, pos) = _ubjson_value(buf, pos, marker, skip, keep_value)
+            if keep_value:
+                result[key] = value
+        else:
+            (value, pos) = _ubjson_value(buf, pos, marker if value_marker is None else value_marker, skip, keep)
+            if keep:
+                result.append(value)
+    return (result, pos)
+
+
+def _parse_metadata(reader, handlers, skip = frozenset()):
+    """Parse the `metadata` element that follows the events. It's decoded in a single pass over the rest of the replay, without a general-purpose UBJSON library. Keys in `skip` (at any depth) are left out of the raw metadata, and of anything derived from it."""
+
+    expect_bytes(b'U\x08metadata', reader)
+
+    data = reader.rest()
+    try:
+        (json, pos) = _ubjson_value(data, 1, data[0], skip)
+        if data[pos] != 0x7d: # }
+            raise ValueError('expected end of replay, but got: 0x%02x' % data[pos])
+    except (IndexError, struct.error): # truncated
+        raise EOFError() from None
 
-    json = ubjson.load(stream)
     raw_handler = handlers.get(ParseEvent.METADATA_RAW)
     if raw_handler:
         raw_handler(json)
 
-    metadata = Metadata._parse(json)
     handler = handlers.get(ParseEvent.METADATA)
     if handler:
-        handler(metadata)
+        handler(Metadata._parse(json))
 
-    expect_bytes(b'}', stream)
 
+def _read_metadata(reader, skip = frozenset()):
+    expect_bytes(b'{U\x03raw[$U#l', reader)
+    (length,) = unpack('l', reader)
+    if not length: # in-progress replay, no metadata yet
+        return None
 
-def _parse_try(input: BinaryIO, handlers, skip_frames):
-    """Wrap parsing exceptions with additional information."""
+    reader.skip(length)
+    metadata = None
+    def set_metadata(x):
+        nonlocal metadata
+        metadata = x
+    _parse_metadata(reader, {ParseEvent.METADATA: set_metadata}, skip)
+    return metadata
 
-    try:
-        _parse(input, handlers, skip_frames)
-    except Exception as e:
-        e = e if isinstance(e, ParseError) else ParseError(str(e))
 
-        try: e.filename = input.name # type: ignore
-        except AttributeError: pass
+def _parse(reader, handlers, skip_frames, include, ports = None, data = _ALL_DATA, stats = None, skip_metadata = frozenset()):
+    if stats is not None:
+        start = reader.offset()
+        stats._lap(None)
 
-        try:
-            # prefer provided position info, as it will be more accurate
-            if not e.pos and input.seekable(): # type: ignore
-                e.pos = input.tell() # type: ignore
-        # not all stream-like objects support `seekable` (e.g. HTTP requests)
-        except AttributeError: pass
+    (payload_sizes, total_size) = _parse_header(reader)
+    if stats is not None:
+        stats._lap('header')
 
-        raise e
+    for (event, value) in _parse_events(reader, payload_sizes, total_size, skip_frames, include, ports, data, stats):
+        handler = handlers.get(event)
+        if handler:
+            handler(value)
+    if stats is not None:
+        stats._lap('events')
 
+    if ParseEvent.METADATA in include or ParseEvent.METADATA_RAW in include:
+        _parse_metadata(reader, handlers, skip_metadata)
+
+    if stats is not None:
+        stats._lap('metadata')
+        stats.files += 1
+        stats.bytes_read += reader.offset() - start
+        # events were counted by raw code, for speed
+        for code in [c for c in stats.events if type(c) is int and c in _EVENT_CODES]:
+            count = stats.events.pop(code)
+            stats.events[EventType(code)] = count
 
-def _parse_open(input: os.PathLike, handlers, skip_frames) -> None:
-    with open(input, 'rb') as f:
-        _parse_try(f, handlers, skip_frames)
 
+def _wrap_error(e, reader):
+    """Add filename & position information to a parsing exception."""
 
-def parse(input: Union[BinaryIO, str, os.PathLike], handlers: Dict[ParseEvent, Callable[..., None]], skip_frames: bool = False) -> None:
+    e = e if isinstance(e, ParseError) else ParseError(str(e))
+
+    if reader.name:
+        e.filename = reader.name
+
+    # prefer provided position info, as it will be more accurate
+    if not e.pos:
+        e.pos = reader.tell()
+
+    return e
+
+
+@contextlib.contextmanager
+def _open(input, use_mmap = False):
+    """Yield a reader for any supported input. Exceptions raised while it's in use are wrapped in :py:class:`ParseError`."""
+
+    if isinstance(input, (str, os.PathLike)):
+        # unbuffered, as `_StreamReader` does its own buffering
+        with open(input, 'rb', buffering=0) as f:
+            if use_mmap:
+                try: buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError: raise ParseError('empty file', filename = f.name) # can't map an empty file
+                # Deliberately not closed: event payloads are slices of this map,
+                # so it has to live as long as they do.
+                reader = _BufferReader(buf, f.name)
+            else:
+                reader = _StreamReader(f, f.name)
+            try: yield reader
+            except Exception as e: raise _wrap_error(e, reader)
+    else:
+        if isinstance(input, (bytes, bytearray, memoryview)):
+            reader = _BufferReader(input)
+        else:
+            try: name = input.name
+            except AttributeError: name = None
+            reader = _StreamReader(input, name)
+        try: yield reader
+        except Exception as e: raise _wrap_error(e, reader)
+
+
+def parse(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], handlers: Dict[ParseEvent, Callable[..., None]], skip_frames: bool = False, use_mmap: bool = False, include: Optional[Iterable[ParseEvent]] = None, ports: Optional[Iterable[int]] = None, data: Iterable[str] = _ALL_DATA, stats: Optional[ParseStats] = None, skip_metadata: Iterable[str] = ()) -> None:
     """Parse a Slippi replay.
 
-    :param input: replay file object or path
+    :param input: replay file object, path, or in-memory replay data (`bytes`/`memoryview`). In-memory data is walked in place: frame data refers to slices of it rather than copies.
     :param handlers: dict of parse event keys to handler functions. Each event will be passed to the corresponding handler as it occurs.
-    :param skip_frames: when true, skip past all frame data. Requires input to be seekable."""
+    :param skip_frames: when true, skip past all frame data. File objects that can't seek are read through instead.
+    :param use_mmap: when true and `input` is a path, memory-map the file and parse it in place, as for in-memory data. Frame data then holds slices of the map (which keep it open), and can't be pickled.
+    :param include: parse events to produce (default: those that have handlers). Replay events that aren't needed for any of them are skipped over without being decoded; e.g. with only `START` and `END`, no frame data is decoded at all.
+    :param ports: if not None, only decode frame data for these ports (0-3). Other ports' events are skipped over, so they're `None` in :py:attr:`slippi.event.Frame.ports`.
+    :param data: which kinds of per-character frame data to decode: any of `'pre'` and `'post'`. Frame data that isn't decoded is `None`.
+    :param stats: if not None, add statistics about this parse to it. Without it, no statistics are gathered at all.
+    :param skip_metadata: metadata keys to leave out, at any depth (e.g. `'players'`). Their values are passed over without being decoded, and are missing from both `METADATA_RAW` and `METADATA`."""
 
-    if isinstance(input, str):
-        _parse_open(pathlib.Path(input), handlers, skip_frames)
-    elif isinstance(input, os.PathLike):
-        _parse_open(input, handlers, skip_frames)
-    else:
-        _parse_try(input, handlers, skip_frames)
+    include = frozenset(handlers if include is None else include)
+    (ports, data) = _selection(ports, data)
+    with _open(input, use_mmap) as reader:
+        _parse(reader, handlers, skip_frames, include, ports, data, stats, frozenset(skip_metadata))
+
+
+def iter_events(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], skip_frames: bool = False, use_mmap: bool = False, include: Optional[Iterable[ParseEvent]] = None, ports: Optional[Iterable[int]] = None, data: Iterable[str] = _ALL_DATA) -> Iterator[Tuple[ParseEvent, Any]]:
+    """Parse a Slippi replay lazily, as a generator.
+
+    Yields the same events, with the same values, that :py:func:`parse` would pass to its handlers. By default that's `(ParseEvent.START, start)`, then `(ParseEvent.FRAME, frame)` for each frame, `(ParseEvent.END, end)`, and finally the metadata. Nothing is retained between events, and parsing stops as soon as the generator is closed (e.g. by breaking out of a loop over it).
+
+    :param input: replay file object, path, or in-memory replay data
+    :param skip_frames: when true, skip past all frame data. File objects that can't seek are read through instead.
+    :param use_mmap: when true and `input` is a path, memory-map the file instead of reading it
+    :param include: parse events to produce (default: `START`, `FRAME`, `END`, `METADATA_RAW` and `METADATA`). See :py:func:`parse`.
+    :param ports: if not None, only decode frame data for these ports (see :py:func:`parse`)
+    :param data: which kinds of per-character frame data to decode (see :py:func:`parse`)"""
+
+    include = _DEFAULT_INCLUDE if include is None else frozenset(include)
+    (ports, data) = _selection(ports, data)
+    with _open(input, use_mmap) as reader:
+        (payload_sizes, total_size) = _parse_header(reader)
+        yield from _parse_events(reader, payload_sizes, total_size, skip_frames, include, ports, data)
+        if not (ParseEvent.METADATA in include or ParseEvent.METADATA_RAW in include):
+            return
+
+        metadata: List[Tuple[ParseEvent, Any]] = []
+        _parse_metadata(reader, {
+            ParseEvent.METADATA_RAW: lambda x: metadata.append((ParseEvent.METADATA_RAW, x)),
+            ParseEvent.METADATA: lambda x: metadata.append((ParseEvent.METADATA, x))})
+        yield from (m for m in metadata if m[0] in include)
+
+
+def iter_frames(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], use_mmap: bool = False, ports: Optional[Iterable[int]] = None, data: Iterable[str] = _ALL_DATA) -> Iterator[Frame]:
+    """Parse a replay's frames lazily, as a generator. Each :py:class:`slippi.event.Frame` is yielded as soon as it's complete, and frames are not retained. Metadata is not parsed.
+
+    Note that in netplay replays, a frame can be yielded more than once: a rollback re-sends every frame it re-simulates, and the last copy of each frame is the correct one.
+
+    :param input: replay file object, path, or in-memory replay data
+    :param use_mmap: when true and `input` is a path, memory-map the file instead of reading it
+    :param ports: if not None, only decode frame data for these ports (see :py:func:`parse`)
+    :param data: which kinds of per-character frame data to decode (see :py:func:`parse`)"""
+
+    (ports, data) = _selection(ports, data)
+    with _open(input, use_mmap) as reader:
+        (payload_sizes, total_size) = _parse_header(reader)
+        for (_, frame) in _parse_events(reader, payload_sizes, total_size, False, frozenset([ParseEvent.FRAME]), ports, data):
+            yield frame
+
+
+def follow(input: Union[str, os.PathLike], poll_interval: float = 0.05, timeout: Optional[float] = None) -> Iterator[Tuple[ParseEvent, Any]]:
+    """Parse a replay as it's being written (e.g. by Dolphin or a Wii during a game), as a generator.
+
+    Yields `(ParseEvent.START, start)`, `(ParseEvent.FRAME, frame)` for each frame and `(ParseEvent.END, end)`, like :py:func:`iter_events`. Whenever parsing catches up with the writer, blocks until more data is appended, resuming mid-event if need be. The generator finishes after the end of the game; metadata is not parsed, as it's written afterwards.
+
+    As with :py:func:`iter_frames`, netplay rollbacks can cause a frame to be yielded more than once.
+
+    :param input: replay path
+    :param poll_interval: seconds to sleep between checks for new data
+    :param timeout: if not None, give up with a :py:class:`ParseError` after this many seconds without new data"""
+
+    with open(input, 'rb') as f:
+        reader = _FollowReader(f, f.name, poll_interval, timeout)
+        try:
+            (payload_sizes, total_size) = _parse_header(reader)
+            yield from _parse_events(reader, payload_sizes, total_size, False)
+        except Exception as e: raise _wrap_error(e, reader)
+
+
+def read_metadata(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike], skip: Iterable[str] = ()) -> Optional[Metadata]:
+    """Read only a replay's metadata, without parsing any events. Seeks straight from the header to the metadata, so the cost doesn't depend on the length of the game.
+
+    :param input: replay file object, path, or in-memory replay data. File objects that can't seek are read through to the metadata.
+    :param skip: metadata keys to leave out, at any depth. E.g. with `('players', 'consoleNick')`, only the date, duration & platform are decoded.
+    :returns: the replay's metadata, or None for an in-progress replay (which doesn't have any yet)"""
+
+    with _open(input) as reader:
+        return _read_metadata(reader, frozenset(skip))
+
+
+def read_metadata_dir(path: Union[str, os.PathLike], recursive: bool = True) -> Iterator[Tuple[str, Union[Metadata, OSError, None]]]:
+    """Read the metadata of every replay (`*.slp`) in a directory, as with :py:func:`read_metadata`.
+
+    Files are visited in sorted order. A file that can't be read or parsed doesn't stop the batch: its error (an `OSError`, e.g. a :py:class:`ParseError`) is yielded in place of its metadata.
+
+    :param path: directory to search
+    :param recursive: when true, include subdirectories
+    :returns: `(path, metadata)` pairs"""
+
+    for (root, dirs, files) in os.walk(os.fspath(path)):
+        dirs.sort()
+        if not recursive:
+            dirs.clear()
+        for name in sorted(files):
+            if name.endswith('.slp'):
+                file = os.path.join(root, name)
+                result: Union[Metadata, OSError, None]
+                try: result = read_metadata(file)
+                except OSError as e: result = e # including ParseError
+                yield (file, result)
@@ -0,0 +1,146 @@
+"""A game's outcome (who won, final stocks & percents, when each stock was lost), from a single pass over a replay that decodes only what it needs."""
+
+from __future__ import annotations
+
+import os
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from .event import FIRST_FRAME_INDEX, End, EventType, Start
+from .metadata import Metadata
+from .parse import ParseEvent, _open, _parse_header, _parse_metadata
+from .util import *
+
+
+class Summary(Base):
+    """The outcome of a game (see :py:func:`summarize`)."""
+
+    __slots__ = 'start', 'end', 'metadata', 'frame_count', 'players', 'winner'
+
+    start: Optional[Start] #: Information about the start of the game
+    end: Optional[End] #: Information about the end of the game
+    metadata: Optional[Metadata] #: Date, duration & platform of the game (per-player metadata and the console name aren't decoded, so they're always None)
+    frame_count: int #: Number of frames in the game (the length of :py:attr:`slippi.game.Game.frames`)
+    players: Tuple[Optional[Summary.Player], ...] #: Final state of each port's character (port 1 is at index 0; empty ports will contain None)
+    winner: Optional[int] #: Port of the player who won, if there was exactly one (None for teams games, draws, and games that were quit without a clear winner)
+
+    def __init__(self, start: Optional[Start], end: Optional[End], metadata: Optional[Metadata], frame_count: int, players: Tuple[Optional[Summary.Player], ...], winner: Optional[int]):
+        self.start = start
+        self.end = end
+        self.metadata = metadata
+        self.frame_count = frame_count
+        self.players = players
+        self.winner = winner
+
+
+    class Player(Base):
+        """Final state of a character. For Ice Climbers, that's the leader (Popo)."""
+
+        __slots__ = 'stocks', 'damage', 'last_hit_by', 'deaths', '_history'
+
+        stocks: int #: Number of stocks remaining
+        damage: float #: Damage percent
+        last_hit_by: Optional[int] #: Port of the character that last hit this character
+        deaths: List[int] #: Index (see :py:attr:`slippi.event.Frame.index`) of each frame on which this character lost a stock
+
+        def __init__(self, stocks: int, damage: float, last_hit_by: Optional[int], deaths: List[int]):
+            self.stocks = stocks
+            self.damage = damage
+            self.last_hit_by = last_hit_by
+            self.deaths = deaths
+            self._history: List[int] = [] # stocks before each of `deaths`
+
+
+# Just the post-frame fields a summary needs: frame, port, is_follower, damage, last_hit_by & stocks.
+_POST = struct.Struct('>iB?15xf6xBB')
+
+# Metadata a summary doesn't need (characters are in `start`).
+_METADATA_SKIP = frozenset(['players', 'consoleNick'])
+
+
+def _winner(start, end, players):
+    ports = [i for (i, p) in enumerate(players) if p is not None]
+    if end is None or (start is not None and start.is_teams) or len(ports) < 2:
+        return None
+
+    if end.method is End.Method.NO_CONTEST:
+        # whoever didn't quit, in a 1v1
+        if end.lras_initiator is not None and len(ports) == 2 and end.lras_initiator in ports:
+            return ports[1 - ports.index(end.lras_initiator)]
+        return None
+
+    if end.method is End.Method.TIME:
+        # most stocks, then least damage
+        ranked = sorted(ports, key=lambda i: (-players[i].stocks, players[i].damage))
+        (first, second) = (players[ranked[0]], players[ranked[1]])
+        return ranked[0] if (first.stocks, first.damage) != (second.stocks, second.damage) else None
+
+    alive = [i for i in ports if players[i].stocks > 0]
+    return alive[0] if len(alive) == 1 else None
+
+
+def _summarize(reader):
+    (payload_sizes, total_size) = _parse_header(reader)
+
+    post = EventType.FRAME_POST.value
+    game_start = EventType.GAME_START.value
+    game_end = EventType.GAME_END.value
+
+    start = None
+    end = None
+    players = [None, None, None, None]
+    last_frame = None
+
+    # Same loop as `slippi.parse._parse_events`, minus everything but post-frame updates.
+    bytes_read = 0
+    while total_size == 0 or bytes_read < total_size:
+        code = reader.byte()
+        try: size = payload_sizes[code]
+        except KeyError: raise ValueError('unexpected event type: 0x%02x' % code)
+        bytes_read += 1 + size
+
+        if code == post:
+            (frame, port, is_follower, damage, last_hit_by, stocks) = _POST.unpack_from(reader.read(size))
+            last_frame = frame
+            if is_follower:
+                continue
+
+            p = players[port]
+            if p is None:
+                p = players[port] = Summary.Player(stocks, damage, None, [])
+            else:
+                # Frames re-sent due to rollback replace the earlier copies, so forget any deaths on or after this frame.
+                while p.deaths and p.deaths[-1] >= frame:
+                    p.deaths.pop()
+                    p.stocks = p._history.pop()
+                if stocks < p.stocks:
+                    p.deaths.append(frame)
+                    p._history.append(p.stocks)
+                p.stocks = stocks
+            p.damage = damage
+            p.last_hit_by = last_hit_by if last_hit_by < 4 else None
+        elif code == game_start:
+            start = Start._parse(reader.read(size))
+        elif code == game_end:
+            end = End._parse(reader.read(size))
+            break
+        else:
+            reader.skip(size)
+
+    metadata = None
+    if total_size: # metadata follows the events, and only once the game is over
+        def set_metadata(x):
+            nonlocal metadata
+            metadata = x
+        _parse_metadata(reader, {ParseEvent.METADATA: set_metadata}, _METADATA_SKIP)
+
+    frame_count = last_frame - FIRST_FRAME_INDEX + 1 if last_frame is not None else 0
+    return Summary(start, end, metadata, frame_count, tuple(players), _winner(start, end, players))
+
+
+def summarize(input: Union[BinaryIO, bytes, memoryview, str, os.PathLike]) -> Summary:
+    """Get a game's outcome without building any frames. Only a few fields of each post-frame update are decoded, and only a running total per character is kept, so this is much faster than :py:class:`slippi.game.Game` and its memory use doesn't grow with the length of the game.
+
+    :param input: replay file object, path, or in-memory replay data"""
+
+    with _open(input) as reader:
+        return _summarize(reader)
@@ -1,5 +1,5 @@
-import enum, os, re, struct, sys
-from typing import Tuple
+import enum, functools, os, re, struct, sys
+from typing import Dict, List, Tuple
 
 from .log import log
 
@@ -32,21 +32,31 @@ def _format(obj):
         return str(obj)
 
 
-def try_enum(enum, val):
-    try:
-        return enum(val)
-    except ValueError:
-        log.info('unknown %s: %s' % (enum.__name__, val))
-        return val
+def enum_table(enum, default = None) -> tuple:
+    """Dense lookup table for an int enum, indexed by raw value: element `i` is the member whose value is `i`, or `default` if there isn't one (the raw value itself if `default` is None).
+
+    Decoders use these instead of calling the enum, so that resolving a value, known or not, is one bounds check and one index rather than an exception. Negative members can't be looked up this way."""
+
+    table = list(range(max(m.value for m in enum) + 1))
+    if default is not None:
+        table = [default] * len(table)
+    for m in enum:
+        if m.value >= 0:
+            table[m.value] = m
+    return tuple(table)
+
+
+@functools.lru_cache(maxsize=None)
+def _struct(fmt):
+    return struct.Struct('>' + fmt)
 
 
 def unpack(fmt, stream):
-    fmt = '>' + fmt
-    size = struct.calcsize(fmt)
-    bytes = stream.read(size)
+    s = _struct(fmt)
+    bytes = stream.read(s.size)
     if not bytes:
         raise EOFError()
-    return struct.unpack(fmt, bytes)
+    return s.unpack(bytes)
 
 
 def expect_bytes(expected_bytes, stream):
@@ -55,6 +65,54 @@ def expect_bytes(expected_bytes, stream):
         raise Exception(f'expected {expected_bytes}, but got: {read_bytes}')
 
 
+class Layout:
+    """Binary layout of an event payload, as groups of fields in the order Slippi added them.
+
+    Slippi only ever appends fields to an event, so the payload size from the event payloads table tells us which groups are present. Each distinct size gets one precompiled :py:class:`struct.Struct`, and payloads are then decoded with a single `unpack_from`."""
+
+    __slots__ = 'groups', '_structs'
+
+    def __init__(self, *groups: Tuple[str, str]):
+        """:param groups: `(format, names)` pairs, where `format` is a :py:mod:`struct` format (without byte order) and `names` holds a space-separated name for each value it unpacks to"""
+        self.groups = groups
+        self._structs: Dict[int, struct.Struct] = {}
+
+    def _fit(self, size):
+        fmt = '>'
+        count = 0
+        for (group, _) in self.groups:
+            if struct.calcsize(fmt + group) > size:
+                break
+            fmt += group
+            count += 1
+        if not count:
+            raise EOFError()
+        return (fmt, count)
+
+    def struct(self, size: int) -> struct.Struct:
+        """Return the struct covering every field group that fits in a payload of `size` bytes."""
+        try: return self._structs[size]
+        except KeyError: pass
+
+        (fmt, _) = self._fit(size)
+        s = self._structs[size] = struct.Struct(fmt)
+        return s
+
+    def fields(self, size: int) -> List[Tuple[str, str]]:
+        """Return `(name, code)` for each field present in a payload of `size` bytes, where `code` is a single :py:mod:`struct` code (with a length, for strings)."""
+        (_, count) = self._fit(size)
+        fields: List[Tuple[str, str]] = []
+        for (group, names) in self.groups[:count]:
+            codes = []
+            for (n, code) in re.findall(r'(\d*)([a-zA-Z?])', group):
+                if code == 's':
+                    codes.append(n + code)
+                elif code != 'x':
+                    codes.extend([code] * int(n or '1'))
+            fields.extend(zip(names.split(), codes))
+        return fields
+
+
 class Base:
     __slots__: Tuple = ()
 
@@ -90,8 +148,13 @@ class IntEnum(enum.IntEnum):
 
 class IntFlag(enum.IntFlag):
     def __repr__(self):
-        members, _ = enum._decompose(self.__class__, self._value_)
-        return '%s:%s' % (bin(self._value_), '|'.join([str(m._name_ or m._value_) for m in members]))
+        value = self._value_
+        members = sorted((m for m in self.__class__ if m._value_ and value & m._value_ == m._value_), key=lambda m: m._value_, reverse=True)
+        rest = value
+        for m in members:
+            rest &= ~m._value_
+        names = [m._name_ for m in members] + ([str(rest)] if rest else [])
+        return '%s:%s' % (bin(value), '|'.join(names) or self._name_ or '0')
 
 
 class EOFError(IOError):
@@ -1,13 +1,15 @@
 #!/usr/bin/python3
 
-import datetime, glob, os, subprocess, unittest
+import datetime, decimal, glob, io, os, shutil, subprocess, sys, tempfile, threading, time, unittest
 
-from slippi import Game, parse
-from slippi.id import CSSCharacter, InGameCharacter, Item, Stage
-from slippi.log import log
+from slippi import Game, ReplayCache, build_index, follow, index_path, iter_events, iter_frames, open_index, parse, parse_many, read_frames, read_metadata, read_metadata_dir, summarize
+from slippi.columnar import ColumnarGame
+from slippi.game import FrameStore
+from slippi.index import FrameIndex
+from slippi.id import ActionState, CSSCharacter, InGameCharacter, Item, Stage
 from slippi.metadata import Metadata
-from slippi.event import Buttons, Direction, End, Frame, Position, Start, Triggers, Velocity
-from slippi.parse import ParseEvent
+from slippi.event import Buttons, Direction, End, EventType, Frame, Position, Start, Triggers, Velocity
+from slippi.parse import ParseEvent, ParseStats
 
 
 BPhys = Buttons.Physical
@@ -18,6 +20,18 @@ def norm(f):
     return 1 if f > 0.01 else -1 if f < -0.01 else 0
 
 
+def frame_data(f):
+    """Comparable summary of a frame (frame data classes don't all support `==`)."""
+    return (f.index, f.items, [p and (
+        p.leader.pre and (p.leader.pre.state, p.leader.pre.position, p.leader.pre.buttons),
+        p.leader.post and (p.leader.post.state, p.leader.post.position, p.leader.post.damage, p.leader.post.stocks))
+        for p in f.ports])
+
+
+def frame_count(path):
+    return len(Game(path).frames)
+
+
 def path(name):
     return os.path.join(os.path.dirname(__file__), 'replays', name + '.slp')
 
@@ -78,6 +92,10 @@ class TestGame(unittest.TestCase):
         self.assertEqual(game.metadata.players, (None, None, None, None))
         self.assertEqual(game.start.players[0].character, CSSCharacter.FOX)
         self.assertEqual(game.start.players[1].character, CSSCharacter.GANONDORF)
+        # fields added by later versions are absent, rather than decoded from a short payload
+        self.assertEqual(game.start.players[0].tag, None)
+        self.assertEqual(game.start.is_pal, None)
+        self.assertEqual(game.end.lras_initiator, None)
 
     def test_game(self):
         game = self._game('game')
@@ -146,6 +164,128 @@ class TestGame(unittest.TestCase):
         self.assertFalse(game.frames)
 
 
+    def test_game_mmap(self):
+        game = Game(path('buttons_abxy'), use_mmap=True)
+        self.assertIsInstance(game.frames[0].ports[0].leader._pre, memoryview)
+        self.assertEqual(self._button_seq(game), self._button_seq(self._game('buttons_abxy')))
+        self.assertEqual(game.metadata, self._game('buttons_abxy').metadata)
+
+    def test_game_ports(self):
+        full = self._game('game')
+        game = Game(path('game'), ports=[1], data=('post',))
+        self.assertEqual(len(game.frames), len(full.frames))
+        for (f, g) in zip(game.frames[::500], full.frames[::500]):
+            self.assertEqual(f.ports[0], None)
+            self.assertEqual(f.ports[1].leader.pre, None)
+            self.assertEqual(repr(f.ports[1].leader.post), repr(g.ports[1].leader.post))
+
+        # the same selection from a stream that can't seek back
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        r, w = os.pipe()
+        with open(r, 'rb') as pipe:
+            threading.Thread(target=lambda: (os.write(w, data), os.close(w))).start()
+            frames = list(iter_frames(pipe, ports=[1], data=('post',)))
+        self.assertEqual(repr([f.ports for f in frames[::500]]), repr([f.ports for f in game.frames[::500]]))
+
+        with self.assertRaises(ValueError):
+            Game(path('game'), data=('positions',))
+
+    def test_game_compact(self):
+        for name in ('game', 'ics', 'items', 'netplay'):
+            full = self._game(name)
+            game = Game(path(name), compact=True)
+            self.assertIsInstance(game.frames, FrameStore)
+            self.assertEqual(len(game.frames), len(full.frames))
+            self.assertEqual([frame_data(f) for f in game.frames], [frame_data(f) for f in full.frames])
+            self.assertEqual([(f.start, f.end) for f in game.frames[-10:]], [(f.start, f.end) for f in full.frames[-10:]])
+
+        self.assertEqual(frame_data(game.frames[-1]), frame_data(full.frames[-1]))
+        self.assertEqual(frame_data(game.frame_at(-1)), frame_data(full.frames[-1]))
+        self.assertIsNot(game.frames[0], game.frames[0]) # not kept
+        with self.assertRaises(IndexError):
+            game.frames[len(full.frames)]
+
+        game = Game(path('netplay'), compact=True, cache_frames=2)
+        (first, second) = (game.frames[0], game.frames[1])
+        self.assertIs(game.frames[0], first)
+        game.frames[2]
+        self.assertIs(game.frames[0], first)
+        self.assertIsNot(game.frames[1], second) # least recently used
+        self.assertEqual([frame_data(f) for f in game.frames], [frame_data(f) for f in full.frames])
+        with self.assertRaises(ValueError):
+            Game(path('game'), cache_frames=10)
+
+    def test_game_keep_frames(self):
+        for name in ('game', 'netplay'):
+            full = self._game(name)
+            for n in (1, 3, 10):
+                game = Game(path(name), keep_frames=n)
+                self.assertEqual(len(game.frames), n)
+                self.assertEqual([frame_data(f) for f in game.frames], [frame_data(f) for f in full.frames[-n:]])
+                self.assertEqual(frame_data(game.frame_at(-1)), frame_data(full.frames[-1]))
+
+        with self.assertRaises(ValueError):
+            Game(path('game'), keep_frames=0)
+
+        # a rollback right before the end: after frame 103, frames 100-103 are sent again, then the game ends
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        index = build_index(data)
+        (begin, end) = index._range(100, 104)
+        raw_end = 15 + int.from_bytes(data[11:15], 'big')
+        events = data[15:end] + data[begin:end] + data[index.game_end:raw_end]
+        data = data[:11] + len(events).to_bytes(4, 'big') + events + data[raw_end:]
+        full = self._game('game')
+        for n in (2, 6):
+            game = Game(data, keep_frames=n)
+            self.assertEqual([frame_data(f) for f in game.frames], [frame_data(f) for f in full.frames[104 - n:104]])
+
+    def test_shared_values(self):
+        pres = [f.ports[0].leader.pre for f in self._game('buttons_abxy').frames]
+        neutral = [p.joystick for p in pres if p.joystick == Position(0, 0)]
+        self.assertTrue(neutral)
+        self.assertTrue(all(j is neutral[0] for j in neutral))
+        for (a, b) in zip(pres, pres[1:]):
+            if a.buttons == b.buttons:
+                self.assertIs(a.buttons, b.buttons)
+            if a.triggers == b.triggers:
+                self.assertIs(a.triggers, b.triggers)
+
+        with self.assertRaises(AttributeError):
+            pres[0].joystick.x = 1.0
+        with self.assertRaises(AttributeError):
+            pres[0].buttons.logical = BLog.A
+        with self.assertRaises(AttributeError):
+            pres[0].triggers.physical.l = 1.0
+        self.assertNotEqual(Position(1, 2), Velocity(1, 2))
+        self.assertNotEqual(Position(1, 2), (1, 2))
+        self.assertNotEqual((1, 2), Position(1, 2))
+        self.assertFalse(Position(1, 2) == (1, 2))
+        self.assertEqual(len({Position(1, 2), Position(1, 2)}), 1)
+        self.assertEqual(Buttons(BLog.A, BPhys.A), Buttons(BLog.A.value, BPhys.A.value))
+        self.assertEqual(repr(BLog.A | BLog.Z), '0b100010000:A|Z')
+
+    def test_frame_at(self):
+        full = self._game('game')
+        game = Game(path('game'), skip_frames=True)
+        self.assertEqual(game.frames, [])
+        for i in (0, 2500, -1):
+            self.assertEqual(frame_data(game.frame_at(i)), frame_data(full.frames[i]))
+        self.assertIs(full.frame_at(100), full.frames[100])
+        with self.assertRaises(IndexError):
+            game.frame_at(len(full.frames))
+
+        # file objects are left at the end by parsing, and needn't start at the replay
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        with tempfile.TemporaryFile() as f:
+            f.write(b'prefix' + data)
+            f.seek(6)
+            game = Game(f, skip_frames=True)
+            for i in (2500, 0, -1):
+                self.assertEqual(frame_data(game.frame_at(i)), frame_data(full.frames[i]))
+
     def test_ics(self):
         game = self._game('ics')
         self.assertEqual(game.metadata.players[0].characters, {
@@ -214,6 +354,12 @@ class TestGame(unittest.TestCase):
         game = self._game('console_name')
         self.assertEqual(game.metadata.console_name, 'Station 1')
 
+    def test_console_name_invalid(self):
+        with open(path('console_name'), 'rb') as f:
+            data = f.read()
+        data = data.replace(b'SU\tStation 1', b'SU\tStati\xff\xfe 1')
+        self.assertEqual(Game(data).metadata.console_name, 'Stati\ufffd\ufffd 1')
+
     def test_metadata_json(self):
         game = self._game('game')
         self.assertEqual(game.metadata_raw, {
@@ -229,9 +375,18 @@ class TestGame(unittest.TestCase):
         self.assertEqual(game.start.slippi.version, Start.Slippi.Version(2,0,1))
 
     def test_unknown_event(self):
-        with self.assertLogs(log, 'INFO') as log_context:
+        with self.assertLogs('slippi', 'INFO') as log_context:
             game = self._game('unknown_event')
-        self.assertEqual(log_context.output, ['INFO:root:ignoring unknown event type: 0xff'])
+        self.assertEqual(log_context.output, ['INFO:slippi:ignoring unknown event type: 0xff'])
+
+    def test_unknown_state(self):
+        raw = bytearray(self._game('game').frames[0].ports[0].leader._post)
+        raw[7:9] = (0x1ff).to_bytes(2, 'big') # character-specific, so not in ActionState
+        post = Frame.Port.Data.Post._parse(raw)
+        self.assertEqual(post.state, 0x1ff)
+        self.assertNotIsInstance(post.state, ActionState)
+        self.assertIs(post.character, InGameCharacter.MARTH)
+        self.assertIs(Stage.parse_stage_id(0x1ff), Stage.UNKNOWN)
 
     def test_items(self):
         game = self._game('items')
@@ -269,6 +424,90 @@ class TestGame(unittest.TestCase):
                 type=Item.PEACH_TURNIP,
                 velocity=Velocity(0.0, 0.0))})
 
+    def test_items_lazy(self):
+        frame = next(f for f in self._game('items').frames if f._items)
+        self.assertNotIsInstance(frame._items[0], Frame.Item)
+        self.assertNotIsInstance(frame._start, Frame.Start)
+        self.assertIsInstance(frame.items[0], Frame.Item)
+        self.assertIs(frame.items[0], frame.items[0])
+        self.assertIsInstance(frame.start, Frame.Start)
+
+
+class TestColumnar(unittest.TestCase):
+    def test_columnar(self):
+        game = Game(path('game'))
+        columnar = ColumnarGame(path('game'))
+        self.assertEqual(columnar.start, game.start)
+        self.assertEqual(columnar.end, game.end)
+        self.assertEqual(columnar.metadata, game.metadata)
+        self.assertIsNone(columnar.ports[2])
+
+        post = columnar.ports[0].leader.post
+        self.assertEqual(len(post), len(game.frames))
+        for i in (0, 1000, len(game.frames) - 1):
+            expected = game.frames[i].ports[0].leader.post
+            self.assertEqual(post.frame[i], game.frames[i].index)
+            self.assertEqual(post.position_x[i], expected.position.x)
+            self.assertEqual(post.stocks[i], expected.stocks)
+
+    def test_columnar_flags(self):
+        game = Game(path('items'))
+        post = ColumnarGame(path('items')).ports[0].leader.post
+        self.assertEqual([int(f) for f in post.flags[:300]], [f.ports[0].leader.post.flags.value for f in game.frames[:300]])
+
+    def test_columnar_ics(self):
+        columnar = ColumnarGame(path('ics'))
+        self.assertEqual(len(columnar.ports[0].follower.pre), 344)
+        self.assertTrue(columnar.ports[0].follower.pre.is_follower.all())
+
+    def test_columnar_cache(self):
+        calls = []
+        def read(p):
+            calls.append(p)
+            return ColumnarGame(p)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ReplayCache(tmp)
+            first = cache.get(path('items'), 'columnar', read)
+            second = cache.get(path('items'), 'columnar', read)
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(second.start, first.start)
+            self.assertTrue((second.ports[0].leader.post.array == first.ports[0].leader.post.array).all())
+            self.assertTrue((second.ports[0].leader.post.flags == first.ports[0].leader.post.flags).all())
+
+    @unittest.skipIf(sys.version_info < (3, 8), 'shared memory requires Python 3.8')
+    def test_columnar_shared(self):
+        paths = [path('game'), path('ics'), os.path.join(tempfile.gettempdir(), 'missing.slp')]
+        results = list(parse_many(paths, 'columnar', workers=2, chunksize=1))
+        self.assertIsInstance(results[2][1], OSError)
+
+        for (p, shared) in results[:2]:
+            local = ColumnarGame(p)
+            self.assertEqual(shared.start, local.start)
+            self.assertEqual(shared.metadata, local.metadata)
+            for (a, b) in zip(shared.ports, local.ports):
+                self.assertEqual(a is None, b is None)
+                if a is not None:
+                    self.assertTrue((a.leader.post.array == b.leader.post.array).all())
+                    self.assertEqual(a.follower is None, b.follower is None)
+
+        game = results[0][1]
+        name = game._shm.name
+        with game:
+            self.assertIsNotNone(game.ports[0])
+        self.assertIsNone(game.ports[0])
+
+        # columns still held when the game is closed keep working
+        game = results[1][1]
+        x = game.ports[0].leader.post.position_x
+        expected = ColumnarGame(path('ics')).ports[0].leader.post.position_x
+        game.close()
+        self.assertIsNone(game.ports[0])
+        self.assertTrue((x == expected).all())
+        del x
+        if os.path.isdir('/dev/shm'): # attaching unlinks the block
+            self.assertNotIn(name.lstrip('/'), os.listdir('/dev/shm'))
+
 
 class TestParse(unittest.TestCase):
     def test_parse(self):
@@ -279,6 +518,359 @@ class TestParse(unittest.TestCase):
         parse(path('game'), {ParseEvent.METADATA: set_metadata})
         self.assertEqual(metadata.duration, 5209)
 
+    def test_iter_events(self):
+        events = [e for (e, _) in iter_events(path('game'))]
+        self.assertEqual(events[0], ParseEvent.START)
+        self.assertEqual(events.count(ParseEvent.FRAME), 5209)
+        self.assertEqual(events[-3:], [ParseEvent.END, ParseEvent.METADATA_RAW, ParseEvent.METADATA])
+
+    def test_iter_frames(self):
+        # stop at the first lost stock
+        for frame in iter_frames(path('game')):
+            if frame.ports[1].leader.post.stocks < 4:
+                break
+        self.assertEqual(frame.index, next(f.index for f in Game(path('game')).frames if f.ports[1].leader.post.stocks < 4))
+
+    def test_follow(self):
+        with open(path('netplay'), 'rb') as f:
+            data = f.read()
+        raw_length = int.from_bytes(data[11:15], 'big')
+        # what an in-progress replay looks like: no raw length, no metadata
+        data = data[:11] + bytes(4) + data[15:15 + raw_length]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            replay = os.path.join(tmp, 'live.slp')
+            open(replay, 'wb').close()
+
+            def write():
+                with open(replay, 'ab') as f:
+                    for i in range(0, len(data), 1000): # not aligned to events
+                        f.write(data[i:i+1000])
+                        f.flush()
+                        time.sleep(0.001)
+            writer = threading.Thread(target=write)
+            writer.start()
+            events = list(follow(replay, poll_interval=0.001, timeout=5))
+            writer.join()
+
+        frames = [v for (e, v) in events if e is ParseEvent.FRAME]
+        self.assertEqual(events[0][0], ParseEvent.START)
+        self.assertEqual(events[-1][0], ParseEvent.END)
+        game = Game(path('netplay'))
+        self.assertEqual(frames[-1].index, game.frames[-1].index)
+        self.assertEqual(frames[-1].ports[0].leader.post.position, game.frames[-1].ports[0].leader.post.position)
+
+    def test_read_metadata(self):
+        self.assertEqual(read_metadata(path('game')), Game(path('game')).metadata)
+        self.assertEqual(read_metadata(path('netplay')).players[0].netplay, Metadata.Player.Netplay(code='ABCD#123', name='abcdefghijk'))
+
+    def test_read_metadata_skip(self):
+        metadata = read_metadata(path('netplay'), skip=['names'])
+        self.assertIsNone(metadata.players[0].netplay)
+        self.assertEqual(metadata.players[0].characters, read_metadata(path('netplay')).players[0].characters)
+        metadata = read_metadata(path('console_name'), skip=['players', 'consoleNick'])
+        self.assertEqual((metadata.players, metadata.console_name), ((None, None, None, None), None))
+        self.assertEqual(metadata.duration, read_metadata(path('console_name')).duration)
+
+        raw = []
+        parse(path('netplay'), {ParseEvent.METADATA_RAW: raw.append}, skip_frames=True, skip_metadata=['names', 'lastFrame'])
+        self.assertEqual(sorted(raw[0]), ['playedOn', 'players', 'startAt'])
+        self.assertEqual(raw[0]['players']['0'], {'characters': {'13': 128}})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ReplayCache(tmp)
+            self.assertIsNone(cache.metadata(path('netplay'), skip=['names']).players[0].netplay)
+            self.assertIsNotNone(cache.metadata(path('netplay')).players[0].netplay)
+
+    def test_read_metadata_dir(self):
+        results = dict(read_metadata_dir(os.path.dirname(path('game'))))
+        self.assertEqual(results[path('game')].duration, 5209)
+        self.assertEqual(results[path('ics')].duration, 344)
+        self.assertEqual(len(results), len(glob.glob(path('*'))))
+
+        # unreadable files are reported, and don't stop the batch
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copy(path('game'), os.path.join(tmp, 'a.slp'))
+            os.symlink(os.path.join(tmp, 'missing.slp'), os.path.join(tmp, 'b.slp'))
+            shutil.copy(path('ics'), os.path.join(tmp, 'c.slp'))
+            results = list(read_metadata_dir(tmp))
+        self.assertEqual([os.path.basename(p) for (p, _) in results], ['a.slp', 'b.slp', 'c.slp'])
+        self.assertIsInstance(results[1][1], FileNotFoundError)
+        self.assertEqual(results[2][1].duration, 344)
+
+    def test_parse_bytes(self):
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        frames = []
+        parse(data, {ParseEvent.FRAME: frames.append})
+        self.assertEqual(len(frames), 5209)
+        self.assertEqual(frames[-1].ports[1].leader.post.stocks, Game(path('game')).frames[-1].ports[1].leader.post.stocks)
+
+
+    def test_parse_include(self):
+        events = []
+        parse(path('game'), {
+            ParseEvent.START: lambda x: events.append(ParseEvent.START),
+            ParseEvent.FRAME: lambda x: events.append(ParseEvent.FRAME),
+            ParseEvent.END: lambda x: events.append(ParseEvent.END)},
+            include=[ParseEvent.START, ParseEvent.END])
+        self.assertEqual(events, [ParseEvent.START, ParseEvent.END])
+
+        # non-seekable streams have to read past unwanted events
+        r, w = os.pipe()
+        with open(path('game'), 'rb') as f, open(r, 'rb') as pipe:
+            threading.Thread(target=lambda: (os.write(w, f.read()), os.close(w))).start()
+            events = [e for (e, _) in iter_events(pipe, include=[ParseEvent.END])]
+        self.assertEqual(events, [ParseEvent.END])
+
+    def test_parse_stream(self):
+        class Trickle(io.RawIOBase):
+            # unseekable, and never returns more than a few bytes per read (like a slow socket)
+            def __init__(self, data):
+                self.data = io.BytesIO(data)
+                self.reads = 0
+            def readable(self):
+                return True
+            def readinto(self, b):
+                self.reads += 1
+                return self.data.readinto(memoryview(b)[:7])
+
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        game = Game(path('game'))
+
+        stream = Trickle(data)
+        self.assertEqual([frame_data(f) for f in Game(stream).frames[::500]], [frame_data(f) for f in game.frames[::500]])
+
+        stream = Trickle(data)
+        header = Game(stream, skip_frames=True)
+        self.assertEqual(header.end, game.end)
+        self.assertEqual(header.metadata, game.metadata)
+
+        self.assertEqual(read_metadata(Trickle(data)), game.metadata)
+
+    def test_import(self):
+        # In a fresh interpreter, as this one has already imported everything.
+        # Slow-to-import modules, and slow-to-create enums, shouldn't be loaded up front.
+        code = ';'.join((
+            'import sys, time',
+            't = time.perf_counter()',
+            'import slippi',
+            't = time.perf_counter() - t',
+            "print(t, [m for m in ('logging', 'concurrent.futures', 'termcolor', 'hashlib', 'json', 'slippi._id') if m in sys.modules])"))
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), universal_newlines=True)
+        (t, loaded) = output.split(' ', 1)
+        self.assertEqual(loaded.strip(), '[]')
+        self.assertLess(float(t), 0.5)
+
+        # loaded on demand
+        self.assertEqual(Frame.Port.Data.Post._parse(Game(path('game')).frames[0].ports[0].leader._post).state, ActionState.ENTRY)
+        namespace: dict = {}
+        exec('from slippi.id import *', namespace)
+        self.assertIs(namespace['ActionState'], ActionState)
+        self.assertIs(namespace['Item'], Item)
+
+    def test_log(self):
+        # the logger is configured once, however many of its attributes are used
+        code = "from slippi.log import log; log.name; log.handlers; log.info('hello'); print(len(log.handlers))"
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=dict(os.environ, LOG_LEVEL='info'), stderr=subprocess.STDOUT, universal_newlines=True)
+        self.assertEqual(output.count('hello'), 1)
+        self.assertEqual(output.splitlines()[-1], '1')
+
+    def test_parse_items(self):
+        items = []
+        parse(path('items'), {ParseEvent.ITEM: items.append})
+        self.assertEqual(items, [i for f in Game(path('items')).frames for i in f.items])
+
+
+    def test_read_frames(self):
+        frames = Game(path('game')).frames
+        index = build_index(path('game'))
+        self.assertEqual(list(index.offsets), sorted(index.offsets))
+        self.assertEqual(len(index), len(frames))
+        self.assertEqual([frame_data(f) for f in read_frames(path('game'), 1000, 1010, index)], [frame_data(f) for f in frames[1000:1010]])
+        self.assertEqual([frame_data(f) for f in read_frames(path('game'), -3)], [frame_data(f) for f in frames[-3:]])
+
+    def test_read_frames_rollback(self):
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        index = build_index(data)
+
+        # simulate a rollback: after frame 103, frames 100-103 are sent again
+        (begin, end) = index._range(100, 104)
+        raw_length = int.from_bytes(data[11:15], 'big') + end - begin
+        data = data[:11] + raw_length.to_bytes(4, 'big') + data[15:end] + data[begin:end] + data[end:]
+
+        index = build_index(data)
+        self.assertEqual(list(index.rollbacks[98:106]), [0, 0, 1, 1, 1, 1, 0, 0])
+        self.assertEqual(index.offsets[100], end)
+        self.assertEqual([frame_data(f) for f in read_frames(data, 95, 110, index)], [frame_data(f) for f in Game(data).frames[95:110]])
+
+        stats = ParseStats()
+        Game(data, stats=stats)
+        self.assertEqual(stats.rollbacks, 4)
+
+    def test_parse_stats(self):
+        stats = ParseStats()
+        game = Game(path('game'), stats=stats)
+        self.assertEqual(stats.files, 1)
+        self.assertEqual(stats.bytes_read, os.path.getsize(path('game')))
+        self.assertEqual(stats.events[EventType.FRAME_POST], 2 * len(game.frames))
+        self.assertEqual(stats.events[EventType.GAME_END], 1)
+        self.assertEqual(stats.rollbacks, 0)
+        self.assertEqual(set(stats.times), {'header', 'events', 'metadata'})
+        self.assertGreater(stats.times['events'], stats.times['header'])
+        self.assertEqual(stats.unknown_values, {})
+
+        # first post-frame event: port 0, frame -123. Its state is at payload offset 7.
+        with open(path('game'), 'rb') as f:
+            data = bytearray(f.read())
+        pos = data.index(b'\x38\xff\xff\xff\x85\x00\x00') + 8
+        data[pos:pos + 2] = (0x1ff).to_bytes(2, 'big') # character-specific, so not in ActionState
+        unknown = ParseStats()
+        Game(data, stats=unknown)
+        self.assertEqual(unknown.unknown_values, {('ActionState', 0x1ff): 1})
+
+        other = ParseStats()
+        Game(path('unknown_event'), stats=other)
+        self.assertEqual(other.events[0xff], 1)
+
+        total = sum((s for (_, s) in parse_many([path('game'), path('unknown_event')], 'stats', workers=1)), ParseStats())
+        self.assertEqual(total.files, 2)
+        self.assertEqual(total.events, stats.events + other.events)
+        self.assertEqual(total.unknown_values, stats.unknown_values + other.unknown_values)
+
+    def test_summarize(self):
+        for name in ('game', 'nintendont', 'netplay', 'ics'):
+            game = Game(path(name))
+            summary = summarize(path(name))
+            self.assertEqual(summary.frame_count, len(game.frames))
+            self.assertEqual((summary.start, summary.end), (game.start, game.end))
+            self.assertEqual((summary.metadata.date, summary.metadata.duration, summary.metadata.platform), (game.metadata.date, game.metadata.duration, game.metadata.platform))
+            last = game.frames[-1]
+            for (port, player) in enumerate(summary.players):
+                if last.ports[port] is None:
+                    self.assertIsNone(player)
+                    continue
+                post = last.ports[port].leader.post
+                self.assertEqual((player.stocks, player.damage, player.last_hit_by), (post.stocks, post.damage, post.last_hit_by))
+                stocks = [f.ports[port].leader.post.stocks for f in game.frames]
+                self.assertEqual(player.deaths, [game.frames[i].index for i in range(1, len(stocks)) if stocks[i] < stocks[i-1]])
+
+        self.assertEqual(summarize(path('game')).winner, 0)
+        self.assertEqual(summarize(path('nintendont')).winner, 3)
+        self.assertEqual(summarize(path('netplay')).winner, 1) # port 1 quit
+        self.assertIsNone(summarize(path('ics')).winner) # neither lost a stock
+
+        # a rollback across port 1's death on frame 1876: after frame 1880 (`frames[2003]`), frames 1870-1880 (`frames[1993:2004]`) are sent again
+        with open(path('game'), 'rb') as f:
+            data = f.read()
+        index = build_index(data)
+        (begin, end) = index._range(1993, 2004)
+        raw_length = int.from_bytes(data[11:15], 'big') + end - begin
+        data = data[:11] + raw_length.to_bytes(4, 'big') + data[15:end] + data[begin:end] + data[end:]
+        self.assertEqual(repr(summarize(data)), repr(summarize(path('game'))))
+
+    def test_open_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            replay = shutil.copy(path('game'), tmp)
+            index = open_index(replay)
+            self.assertTrue(os.path.exists(replay + '.idx'))
+            self.assertEqual(index.metadata.duration, read_metadata(replay).duration)
+
+            # loaded from the sidecar
+            loaded = open_index(replay)
+            for attr in ('payload_sizes', 'offsets', 'rollbacks', 'end', 'game_start', 'game_end', 'metadata_raw'):
+                self.assertEqual(getattr(loaded, attr), getattr(index, attr))
+            self.assertEqual([frame_data(f) for f in read_frames(replay, 50, 60, loaded)], [frame_data(f) for f in read_frames(replay, 50, 60)])
+
+            # damaged or stale sidecars are rebuilt
+            with open(replay + '.idx', 'r+b') as f:
+                f.seek(-100, os.SEEK_END)
+                f.write(bytes(100))
+            self.assertEqual(open_index(replay).metadata_raw, index.metadata_raw)
+            os.utime(replay, ns=(0, 0))
+            self.assertEqual(open_index(replay, write=False).metadata_raw, index.metadata_raw)
+            with open(replay + '.idx', 'rb') as f:
+                self.assertNotEqual(f.read(32)[15:23], bytes(8)) # still tagged with the old mtime
+
+            # high-precision numbers in the metadata don't stop it being saved
+            index.metadata_raw['precise'] = decimal.Decimal('1.25')
+            index._save(replay + '.idx', 0, 0)
+            self.assertEqual(FrameIndex._load(replay + '.idx', 0, 0).metadata_raw['precise'], '1.25')
+
+            # sidecars that can't be written are skipped
+            unwritable = os.path.join(replay, 'index') # under a file, so it can't be created
+            self.assertEqual(open_index(replay, unwritable).offsets, index.offsets)
+
+            index_dir = os.path.join(tmp, 'index')
+            open_index(replay, index_dir)
+            self.assertEqual(os.listdir(index_dir), [os.path.basename(index_path(replay, index_dir))])
+
+    def test_replay_cache(self):
+        calls = []
+        def count(p):
+            calls.append(p)
+            return frame_count(p)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            replay = shutil.copy(path('game'), tmp)
+            for key in ('content', 'stat'):
+                cache = ReplayCache(os.path.join(tmp, key), key=key)
+                calls.clear()
+                self.assertEqual(cache.get(replay, 'count', count), 5209)
+                self.assertEqual(cache.get(replay, 'count', count), 5209)
+                self.assertEqual(len(calls), 1)
+                self.assertEqual(cache.metadata(replay).duration, 5209)
+                self.assertEqual(cache.header(replay).start.stage, Stage.YOSHIS_STORY)
+
+            # a copy has the same contents, but a different path
+            copy = shutil.copy(replay, os.path.join(tmp, 'copy.slp'))
+            cache = ReplayCache(os.path.join(tmp, 'content'))
+            cache.get(copy, 'count', count)
+            self.assertEqual(len(calls), 1)
+            cache = ReplayCache(os.path.join(tmp, 'stat'), key='stat')
+            cache.get(copy, 'count', count)
+            self.assertEqual(len(calls), 2)
+
+            # damaged entries are recomputed
+            for entry in glob.glob(os.path.join(tmp, 'stat', '*')):
+                with open(entry, 'r+b') as f:
+                    f.truncate(20)
+            cache.get(copy, 'count', count)
+            self.assertEqual(len(calls), 3)
+
+            # least recently used entries are evicted first
+            cache = ReplayCache(os.path.join(tmp, 'small'), max_size=1000)
+            for kind in ('a', 'b', 'c', 'd'):
+                cache.get(replay, kind, lambda p: bytes(200))
+                os.utime(cache._entry(replay, kind), ns=(0, {'a': 4, 'b': 1, 'c': 2, 'd': 3}[kind] * 10**9))
+            cache.get(replay, 'e', lambda p: bytes(200))
+            self.assertEqual(sorted(os.path.exists(cache._entry(replay, kind)) for kind in 'abcde'), [False, False, True, True, True])
+            self.assertFalse(os.path.exists(cache._entry(replay, 'b')))
+            self.assertFalse(os.path.exists(cache._entry(replay, 'c')))
+            cache.clear()
+            self.assertEqual(os.listdir(cache.path), [])
+
+            cache = ReplayCache(os.path.join(tmp, 'batch'))
+            for workers in (1, 2):
+                results = list(parse_many([replay, os.path.join(tmp, 'missing.slp')], 'header', workers=workers, cache=cache))
+                self.assertEqual(results[0][1].metadata.duration, 5209)
+                self.assertIsInstance(results[1][1], OSError)
+            self.assertEqual(len(os.listdir(cache.path)), 1)
+
+    def test_parse_many(self):
+        paths = [path('game'), path('ics'), os.path.join(tempfile.gettempdir(), 'missing.slp'), path('netplay')]
+        for workers in (1, 2):
+            results = list(parse_many(paths, workers=workers, chunksize=1))
+            self.assertEqual([p for (p, _) in results], paths)
+            self.assertEqual(results[0][1].duration, 5209)
+            self.assertIsInstance(results[2][1], OSError)
+
+        results = dict(parse_many(paths, frame_count, workers=2, ordered=False))
+        self.assertEqual(results[path('ics')], len(Game(path('ics')).frames))
+        self.assertEqual(len(results), len(paths))
+
 
 if __name__ == '__main__':
     unittest.main()
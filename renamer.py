@@ -15,13 +15,17 @@ import py_slippi.slippi as slippi  # py_slippi, parsing library for slp files
 
 _FILTER_INCOMPLETE_SINGLE_PLAYER_GAMES = True
 
+# parse results are cached on disk, so re-running on the same replays is fast
+_CACHE = slippi.ReplayCache()
+
 
 def calc_new_filename(fpath) -> typing.Tuple[typing.Union[str, None], str]:
     if not fpath.endswith('.slp'):
         return None, "ERROR"
 
     try:
-        game = slippi.Game(fpath)
+        # start, end & metadata, plus final stock counts; no need to build every frame
+        game = _CACHE.summary(fpath)
     except IOError as e:
         # try:
         #     # try to parse without frames - sometimes SLPs are corrupted
@@ -212,16 +216,14 @@ def _get_player_text(game, port):
             colorcode = f"({colorcode})"
 
         # tags use full-width chars, e.g. "ＧＨＳＴ", gotta normalize
-        normalized_tag = unicodedata.normalize("NFKC", pdata.tag)
+        normalized_tag = unicodedata.normalize("NFKC", pdata.tag or "")  # no tags before slippi 1.3.0
         tag = re.sub(r'[^a-zA-Z0-9 ]', '_', normalized_tag)  # alphanumeric only pls
         tag = f"({tag})" if len(tag) > 0 else ""
 
         winstate = ""
-        if len(game.frames) > 0:
-            lastframe = game.frames[-1]
-            if lastframe.ports[port] is not None:  # sometimes this is null? unclear why/how
-                stocks = lastframe.ports[port].leader.post.stocks
-                winstate = f"({'L' if stocks == 0 else 'W'}{stocks})"
+        if game.players[port] is not None:  # no frame data for this port
+            stocks = game.players[port].stocks
+            winstate = f"({'L' if stocks == 0 else 'W'}{stocks})"
 
         return f"{portcode}{charcode}{colorcode}{tag}{winstate}"
 
@@ -260,8 +262,13 @@ if __name__ == "__main__":
     fails = []  # files that failed to parse (can occur if wii is shutoff improperly)
     filtered = []
     renames = {}  # orig_filepath -> new_filepath
-    for idx, fpath in enumerate(all_slps):
-        new_fname, status = calc_new_filename(fpath)
+    # parse in parallel; results still come back in order
+    for fpath, result in slippi.parse_many(all_slps, mode=calc_new_filename):
+        if isinstance(result, Exception):
+            print(f"ERROR: failed to parse: {fpath} ({result})")
+            new_fname, status = None, "ERROR"
+        else:
+            new_fname, status = result
         if new_fname is None:
             if status == "ERROR":
                 fails.append(fpath)
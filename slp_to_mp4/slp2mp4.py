@@ -2,7 +2,7 @@
 import os, sys, shutil, uuid, multiprocessing, tempfile, traceback
 
 # need newer (unpublished) version of py_slippi, for skip_frames option.
-from py_slippi.slippi import Game
+from py_slippi.slippi import ReplayCache
 
 from slp_to_mp4.config import Config
 from slp_to_mp4.dolphinrunner import DolphinRunner
@@ -11,6 +11,15 @@ from slp_to_mp4.ffmpegrunner import FfmpegRunner
 # Heavily modified version of https://github.com/NunoDasNeves/slp-to-mp4
 # This version is a utility library and cannot be run as a top-level script.
 
+# Only the duration of each game is needed, so per-player metadata isn't decoded.
+METADATA_SKIP = ('players', 'consoleNick')
+
+
+def read_metadata(slp_file):
+    """Reads (and caches) the metadata needed to record an slp file."""
+    # keyed by path, size & mtime: hashing the whole replay would cost more than reading its metadata again
+    return ReplayCache(key='stat').metadata(slp_file, skip=METADATA_SKIP)
+
 
 def record_slp(conf: Config, slp_file, outfile):
     """Converts a single slp file to an mp4.
@@ -18,9 +27,11 @@ def record_slp(conf: Config, slp_file, outfile):
     :param slp_file: filepath of the slp.
     :param outfile: mp4 filepath to create.
     """
-    # Parse file with py_slippi to determine number of frames
-    slippi_game = Game(slp_file)  # TODO parse without reading frames
-    num_frames = slippi_game.metadata.duration + conf.extra_frames
+    # Read the metadata with py_slippi to determine number of frames (usually cached already, by videomaker)
+    metadata = read_metadata(slp_file)
+    if metadata is None:
+        raise ValueError(f"No metadata (replay still in progress?): {slp_file}")
+    num_frames = metadata.duration + conf.extra_frames
 
     dolphin_dir = os.path.split(conf.path_to_dolphin_exe)[0]
     dolphin_user_dir = os.path.join(dolphin_dir, 'User')
@@ -31,23 +31,32 @@ class MeleeSet:
                               or c in ' _()').strip()
         return f"{safe_string}.mp4"
 
-    def get_metadata(self) -> typing.Sequence[slippi.Game]:
+    def get_metadata(self) -> typing.Sequence[slippi.metadata.Metadata]:
         if self._parsed_metadata is None:
-            res = []
-            for fpath in self.filepaths:
-                try:
-                    game = slippi.Game(fpath, skip_frames=True)
-                    res.append(game)
-                except IOError:
-                    print(f"ERROR: failed to parse SLP in set \"{self.name}\": {fpath}")
-                    traceback.print_exc()
-            self._parsed_metadata = tuple(res)
+            MeleeSet.load_metadata([self])
         return self._parsed_metadata
 
+    @staticmethod
+    def load_metadata(sets: typing.Sequence['MeleeSet']):
+        """Parses the metadata of every SLP in the given sets as one parallel batch."""
+        all_fpaths = [fpath for s in sets for fpath in s.filepaths]
+        # read_metadata caches its results, where record_slp will find them again
+        results = dict(slippi.parse_many(all_fpaths, mode=slp2mp4.read_metadata))
+        for s in sets:
+            res = []
+            for fpath in s.filepaths:
+                metadata = results[fpath]
+                if isinstance(metadata, Exception) or metadata is None:
+                    error = metadata if metadata is not None else "no metadata (replay still in progress?)"
+                    print(f"ERROR: failed to parse SLP in set \"{s.name}\": {fpath}\n  {error}")
+                else:
+                    res.append(metadata)
+            s._parsed_metadata = tuple(res)
+
     def get_game_durations_frames(self, conf: slp2mp4.Config) -> typing.List[int]:
         res = []
-        for game in self.get_metadata():
-            res.append(game.metadata.duration)
+        for metadata in self.get_metadata():
+            res.append(metadata.duration)
             if conf is not None:
                 res[-1] += conf.extra_frames
         return res
@@ -144,6 +153,7 @@ if __name__ == "__main__":
     total_filesize_mb = 0
 
     vids = parse_spec_file(specfile)
+    MeleeSet.load_metadata(vids)
     print(f"\nFound {len(vids)} set(s) with {sum([len(v.filepaths) for v in vids])} total SLP(s):")
     for v in vids:
         processing_time_ms = v.get_approx_processing_time_ms(conf=conf)